@@ -1,8 +1,18 @@
+import os
 import re
-import pdfplumber
-import pandas as pd
+import json
+import hashlib
+import functools
 import yaml
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+from ..value_sets import extract_value_set
+from .. import profiling
+from ..lazy_imports import lazy_import
+
+pdfplumber = lazy_import("pdfplumber")
+pdftypes = lazy_import("pdfminer.pdftypes")
+pd = lazy_import("pandas")
 
 #EXPECTED_HEADERS = {"Field No.", "Field Name;(Technical Field Name)", "Description", "Allowable Values"}
 
@@ -24,6 +34,17 @@ def split_field_name(field_text):
     else:
         return field_text, ""
 
+# Curly quotes, dashes and the ellipsis mapped to their ASCII equivalents in one pass
+CLEAN_TEXT_TABLE = str.maketrans({
+    "\u201C": "\"",  # Left double quotation mark
+    "\u201D": "\"",  # Right double quotation mark
+    "\u2018": "'",   # Left single quotation mark
+    "\u2019": "'",   # Right single quotation mark
+    "\u2013": "-",   # En dash
+    "\u2014": "-",   # Em dash
+    "\u2026": "...", # Ellipsis
+})
+
 def clean_text(text):
     """
     Cleans text by:
@@ -38,115 +59,224 @@ def clean_text(text):
         return ""
     
     # Replace common curly quotes and similar characters.
-    replacements = {
-        "\u201C": "\"",  # Left double quotation mark
-        "\u201D": "\"",  # Right double quotation mark
-        "\u2018": "'",   # Left single quotation mark
-        "\u2019": "'",   # Right single quotation mark
-        "\u2013": "-",   # En dash
-        "\u2014": "-",   # Em dash
-        "\u2026": "...", # Ellipsis
-    }
-    for old, new in replacements.items():
-        text = text.replace(old, new)
+    text = text.translate(CLEAN_TEXT_TABLE)
     
-    # Normalize the text to decompose characters.
-    normalized = unicodedata.normalize("NFKD", text)
-    # Encode to ASCII bytes (ignoring characters that cannot be encoded), then decode back to a string.
-    ascii_text = normalized.encode("ascii", "ignore").decode("ascii")
-    return " ".join(ascii_text.split()).strip()
+    # Text that is already ASCII is unchanged by the normalization, so only the rest goes through it.
+    if not text.isascii():
+        # Normalize the text to decompose characters.
+        normalized = unicodedata.normalize("NFKD", text)
+        # Encode to ASCII bytes (ignoring characters that cannot be encoded), then decode back to a string.
+        text = normalized.encode("ascii", "ignore").decode("ascii")
+    return " ".join(text.split())
 
+def clean_cells(cells):
+    """
+    Cleans a batch of cells, such as one column of a table, with clean_text.
+    Each distinct cell value is cleaned once, so repeated values (e.g. "Y" or empty
+    cells) down a column cost a dictionary lookup.
+    """
+    cleaned = {}
+    result = []
+    for cell in cells:
+        if cell not in cleaned:
+            cleaned[cell] = clean_text(cell)
+        result.append(cleaned[cell])
+    return result
 
+
+@functools.lru_cache(maxsize=None)
 def clean_header(header):
     """
     Cleans header text by removing newlines, extra spaces, and
     ensuring there is no space between ';' and '('.
+    Every page repeats the same header row, so the results are cached.
     """
     header = clean_text(header)
     header = re.sub(r';\s*\(', ';(', header)
     return header
 
-def extract_table_from_pdf(pdf_path):
+def extract_page_table(page):
+    """
+    Extracts the table on a single pdfplumber page and cleans it.
+    Returns a tuple of (page number, cleaned headers, cleaned rows); the rows
+    include the first row of the table. Headers and rows are None if the page
+    has no table.
+    """
+    with profiling.span(f"page {page.page_number}", "page") as counters:
+        # Adjust table_settings if needed.
+        table = page.extract_table(table_settings={
+            "vertical_strategy": "lines",
+            "horizontal_strategy": "lines"
+        })
+        if not table:
+            return page.page_number, None, None
+        # Clean and normalize headers using the clean_header function.
+        headers = [clean_header(h) for h in table[0]]
+        # Clean the table a column at a time; pdfplumber tables have one cell per column in every row.
+        clean_columns = [clean_cells(column) for column in zip(*table)]
+        clean_rows = [list(row) for row in zip(*clean_columns)]
+        counters["table_rows"] = len(clean_rows)
+    return page.page_number, headers, clean_rows
+
+# PDF opened once in each worker process of the page-parallel extractor.
+_worker_pdf = None
+
+def _open_worker_pdf(pdf_path, profile=False):
+    global _worker_pdf
+    _worker_pdf = pdfplumber.open(pdf_path)
+    if profile:
+        profiling.enable()
+
+def _extract_worker_page(page_index):
+    return extract_page_table(_worker_pdf.pages[page_index]), profiling.drain()
+
+def extract_page_tables(pdf_path, workers=1, page_indices=None):
+    """
+    Yields extract_page_table results for the given 0-based page indices (all pages
+    by default) in page order. With more than one worker, pages are farmed out to a
+    process pool in which each worker opens the PDF itself and sends back its
+    profiling spans with each page.
+    """
+    if workers <= 1:
+        with pdfplumber.open(pdf_path) as pdf:
+            pages = pdf.pages if page_indices is None else [pdf.pages[i] for i in page_indices]
+            for page in pages:
+                yield extract_page_table(page)
+        return
+
+    if page_indices is None:
+        with pdfplumber.open(pdf_path) as pdf:
+            page_indices = range(len(pdf.pages))
+    with ProcessPoolExecutor(workers, initializer=_open_worker_pdf,
+                             initargs=(pdf_path, profiling.active() is not None)) as pool:
+        for page_table, events in pool.map(_extract_worker_page, page_indices):
+            profiling.merge(events)
+            yield page_table
+
+def assemble_table_rows(page_tables):
+    """
+    Turns per-page extract_page_table results, in page order, into row dictionaries
+    keyed by the headers found on page 1, yielded as each page comes in. Pages whose first row shares
+    no header with page 1 are treated as continuing the table without a header row.
+    """
+    for page_number, headers, table in page_tables:
+        n=0
+        if table:
+            if page_number == 1:
+                EXPECTED_HEADERS = headers
+            print(f"\nNormalized headers on page {page_number}: {headers}")
+            header_missing = not bool(set(EXPECTED_HEADERS) & set(headers))
+            if header_missing:
+                #print(f"Page {page_number} is flagged as missing header.")
+                n=0
+            else:
+                n=1
+            for row in table[n:]:
+                # Extend row if it's shorter than headers.
+                if len(row) < len(EXPECTED_HEADERS):
+                    row = row + [""] * (len(EXPECTED_HEADERS) - len(row))
+                row_dict = dict(zip(EXPECTED_HEADERS, row))
+                yield row_dict
+
+def extract_table_from_pdf(pdf_path, workers=1):
     """
     Extracts table data from a PDF file using pdfplumber.
     Cleans and normalizes headers and cell values.
-    Returns a list of dictionaries representing each row.
+    Returns an iterator of dictionaries representing each row; pages are extracted
+    as the rows are consumed.
+    """
+    return assemble_table_rows(extract_page_tables(pdf_path, workers))
+
+def page_fingerprint(page):
+    """
+    Returns a SHA-256 fingerprint of a page's content streams and size, which
+    changes whenever anything drawn on the page changes.
+    """
+    digest = hashlib.sha256(repr(page.bbox).encode("ascii"))
+    for stream in page.page_obj.contents:
+        digest.update(pdftypes.resolve1(stream).get_data())
+    return digest.hexdigest()
+
+def page_index_path(output_yaml):
+    """Returns the path of the page fingerprint index stored next to a rules YAML file."""
+    return os.path.splitext(output_yaml)[0] + ".pages.json"
+
+def extract_table_from_pdf_incremental(pdf_path, index_path, workers=1):
+    """
+    Like extract_table_from_pdf, but reuses the cleaned tables cached in the page
+    index for pages whose fingerprint is unchanged and re-extracts only the others.
+    Pages are matched by fingerprint, so inserted or removed pages do not force the
+    pages after them to be re-extracted. The index is rewritten for the new PDF.
     """
-    rows = []
+    cached_tables = {}
+    if os.path.exists(index_path):
+        with open(index_path, "r", encoding="utf-8") as f:
+            for entry in json.load(f)["pages"]:
+                cached_tables[entry["fingerprint"]] = (entry["headers"], entry["rows"])
+
     with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            # Adjust table_settings if needed.
-            table = page.extract_table(table_settings={
-                "vertical_strategy": "lines",
-                "horizontal_strategy": "lines"
-            })
-            n=0
-            if table:
-                # Clean and normalize headers using the clean_header function.
-                headers = [clean_header(h) for h in table[0]]
-                if page.page_number == 1:
-                    EXPECTED_HEADERS = headers
-                print(f"\nNormalized headers on page {page.page_number}: {headers}")
-                header_missing = not bool(set(EXPECTED_HEADERS) & set(headers))
-                if header_missing:
-                    #print(f"Page {page.page_number} is flagged as missing header.")
-                    n=0
-                else:
-                    n=1
-                for row in table[n:]:
-                    # Extend row if it's shorter than headers.
-                    if len(row) < len(EXPECTED_HEADERS):
-                        row = row + [None] * (len(EXPECTED_HEADERS) - len(row))
-                    # Clean each cell in the row.
-                    clean_row = [clean_text(cell) for cell in row]
-                    row_dict = dict(zip(EXPECTED_HEADERS, clean_row))
-                    rows.append(row_dict)
-    return rows
+        fingerprints = [page_fingerprint(page) for page in pdf.pages]
+
+    changed_pages = [i for i, fingerprint in enumerate(fingerprints) if fingerprint not in cached_tables]
+    print(f"Re-extracting {len(changed_pages)} of {len(fingerprints)} pages")
+    extracted = {page_number - 1: (headers, table)
+                 for page_number, headers, table in extract_page_tables(pdf_path, workers, changed_pages)}
+
+    page_tables = []
+    index_entries = []
+    for i, fingerprint in enumerate(fingerprints):
+        headers, table = extracted[i] if i in extracted else cached_tables[fingerprint]
+        page_tables.append((i + 1, headers, table))
+        index_entries.append({"page_number": i + 1, "fingerprint": fingerprint, "headers": headers, "rows": table})
+
+    with open(index_path, "w", encoding="utf-8") as f:
+        json.dump({"pdf": os.path.basename(pdf_path), "pages": index_entries}, f)
+
+    return assemble_table_rows(page_tables)
+
+# Fields whose text carries on into the continuation rows below a field
+CONTINUED_FIELDS = ("Description", "Allowable Values")
 
 def merge_continuation_rows(rows):
     """
-    Iterates over the list of rows (each a dictionary). If a row's "Field No." (after stripping)
-    is empty, it is treated as a continuation row: its "Description" and "Allowable Values"
-    are appended to the previous row. Otherwise, the row is treated as a new field.
+    Iterates over the rows (each a dictionary), such as the rows extract_table_from_pdf
+    yields, and yields the merged fields one at a time. If a row's "Field No." (after
+    stripping) is empty, it is treated as a continuation row: its "Description" and
+    "Allowable Values" are appended, with a space, to the previous row's. Otherwise, the
+    row starts a new field. The text of a field is collected in lists and joined once,
+    when the next field starts, so long fields are merged in linear time.
     """
-    merged_rows = []
-    prev_row = None
-    #print(len(rows))
-    for i, row in enumerate(rows):
-        #print(i)
-        
-        field_no = row.get("Field No.", "")
-        if field_no.strip() == "":
-            # Continuation row: append description and allowed values to the previous row.
-            if prev_row is not None:
-                desc = row.get("Description", "").strip()
-                allow_vals = row.get("Allowable Values", "").strip()
-                if desc:
-                    # Append (with a space) to previous row's description.
-                    prev_desc = prev_row.get("Description", "").strip()
-                    prev_row["Description"] = (prev_desc + " " + desc).strip() if prev_desc else desc
-                if allow_vals:
-                    # Append (with a space) to previous row's allowed values.
-                    prev_allow = prev_row.get("Allowable Values", "").strip()
-                    prev_row["Allowable Values"] = (prev_allow + " " + allow_vals).strip() if prev_allow else allow_vals
-                    if i == len(rows)-1:
-                        merged_rows.append(prev_row)
-            else:
-                # If no previous row exists, simply add the row.
-                #merged_rows.append(row)
-                if i == len(rows)-1:
-                    merged_rows.append(row)
-                prev_row = row
-        else:
-            # New field row.
-            #merged_rows.append(row)
-            if prev_row is not None:
-                merged_rows.append(prev_row)
-            if i == len(rows)-1:
-                merged_rows.append(row)                
-            prev_row = row
-            
-    return merged_rows
+    field = None
+    fragments = None
+    for row in rows:
+        if row.get("Field No.", "").strip() == "" and field is not None:
+            # Continuation row: collect its description and allowed values.
+            for key in CONTINUED_FIELDS:
+                text = row.get(key, "").strip()
+                if text:
+                    fragments[key].append(text)
+            continue
+        # New field row (or continuation rows before the first field, kept as a field of their own).
+        if field is not None:
+            yield join_fragments(field, fragments)
+        field = row
+        fragments = {key: [] for key in CONTINUED_FIELDS}
+    if field is not None:
+        yield join_fragments(field, fragments)
+
+def join_fragments(field, fragments):
+    """
+    Returns a copy of a field row with the text collected from its continuation rows
+    appended to its own, or the row itself if it had none.
+    """
+    if not any(fragments.values()):
+        return field
+    merged = dict(field)
+    for key, texts in fragments.items():
+        if texts:
+            own_text = field.get(key, "").strip()
+            merged[key] = " ".join([own_text] + texts if own_text else texts)
+    return merged
 
 
 def extract_rules_from_table_data(table_data):
@@ -157,6 +287,8 @@ def extract_rules_from_table_data(table_data):
       - Field Name;(Technical Field Name)
       - Description
       - Allowable Values
+      - Value Set (with Value Set Codes for a numbered list) or Value Set Reference, when the
+        Allowable Values list every valid value
     """
     rules = []
     for row in table_data:
@@ -169,9 +301,37 @@ def extract_rules_from_table_data(table_data):
             "Description": row.get("Description", ""),
             "Allowable Values": row.get("Allowable Values", "")
         }
+        rule.update(extract_value_set(rule["Allowable Values"]))
         rules.append(rule)
     return rules
 
+def diff_rules(old_rules, new_rules):
+    """
+    Compares two rule lists keyed by Technical Field Name (or Field No. when that is empty).
+    Returns a dictionary with the added and removed rules and, for modified rules,
+    the old and new versions.
+    """
+    def rule_key(rule):
+        return rule.get("Technical Field Name") or rule.get("Field No.", "")
+
+    old_by_key = {rule_key(rule): rule for rule in old_rules}
+    new_by_key = {rule_key(rule): rule for rule in new_rules}
+    return {
+        "added": [rule for key, rule in new_by_key.items() if key not in old_by_key],
+        "removed": [rule for key, rule in old_by_key.items() if key not in new_by_key],
+        "modified": [{"old": old_by_key[key], "new": rule} for key, rule in new_by_key.items()
+                     if key in old_by_key and old_by_key[key] != rule],
+    }
+
+def load_rules_from_yaml(rules_yaml):
+    """
+    Loads the rules saved by save_rules_to_yaml, or an empty list if the file does not exist.
+    """
+    if not os.path.exists(rules_yaml):
+        return []
+    with open(rules_yaml, "r") as infile:
+        return (yaml.safe_load(infile) or {}).get("rules", [])
+
 def save_rules_to_yaml(rules, output_yaml): 
     """
     Saves the list of rules to a YAML file under the key "rules".
@@ -181,33 +341,60 @@ def save_rules_to_yaml(rules, output_yaml):
         yaml.dump(data, outfile, sort_keys=False, default_flow_style=False)
     print(f"\nRules have been saved to {output_yaml}")
 
-# ---------------- Main Workflow ----------------
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--rules_pdf", required=True, help="Path to the validation results CSV file")
-    args = parser.parse_args()
-    pdf_path = args.rules_pdf
-    #pdf_path = "C://Narasimha//Personal//Hackathon//DownloadAttachment.pdf"  # Update with your PDF file path.
-    output_yaml = "rules.yaml"             # Output YAML file path.
-    #output_yaml = "C://Narasimha//Personal//Hackathon//rules.yaml"             # Output YAML file path.
-    
+# Function to run the extraction workflow
+def extract_rules_to_files(pdf_path, output_yaml, output_csv, workers=1, incremental=False):
+    """
+    Extracts the rules from a PDF and saves them to a YAML file and a CSV file.
+    With incremental, only pages that changed since the last run are re-extracted
+    and the differences from the previous rules are saved next to the YAML file.
+    """
     # 1. Extract table data from the PDF.
-    table_data = extract_table_from_pdf(pdf_path)
-    if not table_data:
+    if incremental:
+        table_data = extract_table_from_pdf_incremental(pdf_path, page_index_path(output_yaml), workers)
+    else:
+        table_data = extract_table_from_pdf(pdf_path, workers)
+    # 2. Process the table data to extract rules, merging rows as the pages are extracted.
+    table_data_merge = merge_continuation_rows(table_data)
+    rules = extract_rules_from_table_data(table_data_merge)
+    if not rules:
         print("No table data extracted from the PDF.")
     else:
-        # 2. Process the table data to extract rules.
-        table_data_merge = merge_continuation_rows(table_data)
-        rules = extract_rules_from_table_data(table_data_merge)
-        
         # Debug: Print each extracted rule dictionary.
         #print("\nExtracted Rules:")
         #for rule in rules:
             #print(rule)
         
-        # 3. Save the rules to a YAML file.
+        # 3. Report what changed since the previous run.
+        if incremental:
+            rules_diff = diff_rules(load_rules_from_yaml(output_yaml), rules)
+            print(f"\nRules added: {len(rules_diff['added'])}, removed: {len(rules_diff['removed'])}, "
+                  f"modified: {len(rules_diff['modified'])}")
+            diff_yaml = os.path.splitext(output_yaml)[0] + ".diff.yaml"
+            with open(diff_yaml, "w") as outfile:
+                yaml.dump(rules_diff, outfile, sort_keys=False, default_flow_style=False)
+            print(f"Rule diff has been saved to {diff_yaml}")
+
+        # 4. Save the rules to a YAML file.
         save_rules_to_yaml(rules, output_yaml)
         
         # save the rules to csv file
         df = pd.DataFrame(rules)
-        df.to_csv("C://Narasimha//Personal//Hackathon//ScheduleH_Data_format_final.csv", index=False)
\ No newline at end of file
+        df.to_csv(output_csv, index=False)
+
+# ---------------- Main Workflow ----------------
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rules_pdf", required=True, help="Path to the validation results CSV file")
+    parser.add_argument("--workers", type=int, default=1, help="Number of processes to extract pages with")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only re-extract pages that changed since the last run and report the rule diff")
+    args = parser.parse_args()
+    pdf_path = args.rules_pdf
+    #pdf_path = "C://Narasimha//Personal//Hackathon//DownloadAttachment.pdf"  # Update with your PDF file path.
+    output_yaml = "rules.yaml"             # Output YAML file path.
+    #output_yaml = "C://Narasimha//Personal//Hackathon//rules.yaml"             # Output YAML file path.
+    extract_rules_to_files(pdf_path, output_yaml, "C://Narasimha//Personal//Hackathon//ScheduleH_Data_format_final.csv",
+                           args.workers, args.incremental)
+
+if __name__ == "__main__":
+    main()
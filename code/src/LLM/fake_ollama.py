@@ -0,0 +1,36 @@
+import asyncio
+import re
+
+class FakeAsyncClient:
+    """
+    Stand-in for ollama.AsyncClient so the async regex generation path can run
+    without a model. Each chat call sleeps for a fixed latency and answers with
+    a simple regex guessed from the Allowable Values in the prompt.
+    Set fail_first to make the first N calls raise, to exercise retries.
+    """
+
+    def __init__(self, latency=0.05, fail_first=0):
+        self.latency = latency
+        self.fail_first = fail_first
+        self.calls = 0
+
+    async def chat(self, model="", messages=None, **kwargs):
+        self.calls += 1
+        # Number this call before sleeping: concurrent calls bump self.calls in the meantime
+        call_number = self.calls
+        await asyncio.sleep(self.latency)
+        if call_number <= self.fail_first:
+            raise ConnectionError("Fake Ollama server unavailable")
+
+        prompt = messages[-1]["content"] if messages else ""
+        match = re.search(r"\*\*Allowable Values\*\*: (.*)", prompt)
+        allowable_values = match.group(1).lower() if match else ""
+        if "country code" in allowable_values:
+            regex = "^[A-Z]{2}$"
+        elif "digit" in allowable_values:
+            regex = "^\\d+$"
+        elif "must not contain" in allowable_values:
+            regex = "^[^\\r\\n,\\p{Cc}]+$"
+        else:
+            regex = ".*"
+        return {"message": {"role": "assistant", "content": f'"{regex}"'}}
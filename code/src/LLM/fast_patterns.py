@@ -0,0 +1,149 @@
+import string
+import regex as re  # Same engine as validateDataYaml
+from ..lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Quantifier after a character class: +, *, {n}, {n,} or {n,m}
+QUANTIFIER = re.compile(r"(?:(?P<symbol>[+*])|\{(?P<min>\d+)(?P<comma>,(?P<max>\d*))?\})?")
+
+# Characters with a special meaning outside a character class
+METACHARACTERS = set(".^$*+?{}[]\\|()")
+
+# Character sets matched with str predicates instead of stripping the set's characters
+NAMED_SETS = {
+    frozenset(string.ascii_letters + string.digits): ("isascii", "isalnum"),
+    frozenset(string.digits): ("isascii", "isdigit"),
+    frozenset(string.ascii_letters): ("isascii", "isalpha"),
+    frozenset(string.ascii_uppercase): ("isascii", "isalpha", "isupper"),
+    frozenset(string.ascii_lowercase): ("isascii", "isalpha", "islower"),
+}
+
+def strip_group(pattern):
+    """Returns the inside of a pattern wrapped in one (...) or (?:...) group, or the pattern itself."""
+    for opening in ("(?:", "("):
+        inner = pattern[len(opening):-1]
+        if pattern.startswith(opening) and pattern.endswith(")") and "(" not in inner and ")" not in inner:
+            return inner
+    return pattern
+
+def parse_class(pattern):
+    """
+    Parses a character class of ASCII literals, ranges and escaped punctuation,
+    or \\d on its own. Returns (characters, end position) where characters is a
+    set of characters or "digit" for \\d, or None if the class is not that simple.
+    """
+    if pattern.startswith("\\d"):
+        return "digit", 2
+    if not pattern.startswith("[") or pattern.startswith("[^"):
+        return None
+    characters = set()
+    i = 1
+    while i < len(pattern) and pattern[i] != "]":
+        char = pattern[i]
+        if char == "\\":
+            escaped = pattern[i + 1:i + 2]
+            if not escaped or escaped.isalnum():
+                return None  # \d, \s, \w, \p{...} and the like inside a class
+            char = escaped
+            i += 1
+        elif char == "[":
+            return None
+        if not char.isascii():
+            return None
+        # A range such as a-z; a - at either end of the class is a literal
+        if pattern[i + 1:i + 2] == "-" and pattern[i + 2:i + 3] not in ("]", ""):
+            end = pattern[i + 2]
+            if end == "\\" or not end.isascii() or end < char:
+                return None
+            characters.update(chr(code) for code in range(ord(char), ord(end) + 1))
+            i += 3
+        else:
+            characters.add(char)
+            i += 1
+    if i >= len(pattern) or not characters:
+        return None
+    return characters, i + 1
+
+# Function to classify a pattern
+def classify_pattern(pattern):
+    """
+    Recognises canonical patterns (see pattern_registry.canonical_pattern) that can be
+    checked without the regex engine:
+      - a run of one character class with length bounds, e.g. [A-Za-z0-9]+ or \\d{4,6},
+        returned as ("class", characters or predicate names, min length, max length);
+      - an alternation of literal strings, e.g. (?:NAICS|SIC|GICS),
+        returned as ("enum", frozenset of the strings).
+    Returns None for anything else, which is left to the regex engine.
+    """
+    pattern = strip_group(str(pattern or ""))
+
+    parsed = parse_class(pattern)
+    if parsed is not None:
+        characters, end = parsed
+        quantifier = QUANTIFIER.fullmatch(pattern, end)
+        if quantifier is None:
+            return None
+        if quantifier.group("symbol"):
+            bounds = (1 if quantifier.group("symbol") == "+" else 0, None)
+        elif quantifier.group("min") is not None:
+            low = int(quantifier.group("min"))
+            if quantifier.group("comma") is None:
+                bounds = (low, low)
+            else:
+                bounds = (low, int(quantifier.group("max")) if quantifier.group("max") else None)
+        else:
+            bounds = (1, 1)
+        if characters == "digit":
+            check = ("isdecimal",)
+        else:
+            check = NAMED_SETS.get(frozenset(characters), "".join(sorted(characters)))
+        return ("class", check) + bounds
+
+    literals = []
+    for alternative in pattern.split("|"):
+        literal, i = [], 0
+        while i < len(alternative):
+            char = alternative[i]
+            if char == "\\":
+                escaped = alternative[i + 1:i + 2]
+                if not escaped or escaped.isalnum():
+                    return None
+                char = escaped
+                i += 1
+            elif char in METACHARACTERS:
+                return None
+            literal.append(char)
+            i += 1
+        literals.append("".join(literal))
+    return ("enum", frozenset(literals))
+
+def plan_matches(values, plan):
+    """
+    Returns a boolean array telling which strings fully match a pattern, using the
+    plan from classify_pattern and vectorised pandas string methods.
+    """
+    values = pd.Series(values, dtype=object)
+    if plan[0] == "enum":
+        return values.isin(plan[1]).to_numpy(dtype=bool)
+
+    _, check, low, high = plan
+    lengths = values.str.len().to_numpy()
+    in_bounds = lengths >= low
+    if high is not None:
+        in_bounds &= lengths <= high
+    if isinstance(check, str):
+        # Stripping every allowed character leaves nothing only if no other character occurs
+        allowed = (values.str.strip(check) == "").to_numpy(dtype=bool)
+    else:
+        # The str predicates are False for an empty string, which a 0-length bound allows
+        allowed = lengths == 0
+        valid = np.ones(len(values), dtype=bool)
+        for method in check:
+            if method == "isascii":
+                valid &= np.fromiter(map(str.isascii, values), dtype=bool, count=len(values))
+            else:
+                valid &= getattr(values.str, method)().to_numpy(dtype=bool)
+        allowed |= valid
+    return in_bounds & allowed
@@ -0,0 +1,186 @@
+import argparse
+import regex as re  # Same engine as validateDataYaml
+import yaml
+from .fast_patterns import classify_pattern
+
+# Process-wide registry of compiled patterns and their fast-path plans, keyed by canonical pattern text
+_compiled_patterns = {}
+_fast_plans = {}
+
+# Lint warnings loaded from a rule bundle, keyed by pattern text
+_lint_warnings = {}
+
+# Quantifiers that let a token repeat without an upper bound
+UNBOUNDED_QUANTIFIER = re.compile(r"[*+]|\{\d*,\}")
+
+# Function to canonicalize a pattern
+def canonical_pattern(pattern):
+    """
+    Returns the pattern with a leading ^ and a trailing $ removed. Rules are always
+    matched with fullmatch, so the anchors do not change what a pattern accepts and
+    '^[A-Z]{2}$' and '[A-Z]{2}' share one compiled pattern.
+    """
+    pattern = str(pattern or "")
+    if pattern.startswith("^"):
+        pattern = pattern[1:]
+    if pattern.endswith("$"):
+        backslashes = len(pattern[:-1]) - len(pattern[:-1].rstrip("\\"))
+        if backslashes % 2 == 0:
+            pattern = pattern[:-1]
+    return pattern
+
+# Function to compile a pattern through the registry
+def compile_pattern(pattern):
+    """
+    Compiles a rule pattern once per process. Patterns that are equal after
+    canonical_pattern return the same compiled object, so callers can group
+    rules that share a pattern by identity.
+    """
+    key = canonical_pattern(pattern)
+    compiled = _compiled_patterns.get(key)
+    if compiled is None:
+        compiled = _compiled_patterns[key] = re.compile(key)
+        if key not in _fast_plans:
+            _fast_plans[key] = classify_pattern(key)
+    return compiled
+
+def fast_plan(pattern):
+    """
+    Returns the fast-path plan (see fast_patterns.classify_pattern) of a compiled
+    pattern, or None if it needs the regex engine.
+    """
+    if pattern.pattern not in _fast_plans:
+        # Patterns compiled outside the registry may carry flags such as IGNORECASE
+        _fast_plans[pattern.pattern] = classify_pattern(pattern.pattern) if pattern.flags == re.compile("").flags else None
+    return _fast_plans[pattern.pattern]
+
+def registry_size():
+    """Returns the number of distinct patterns compiled in this process."""
+    return len(_compiled_patterns)
+
+def group_by_pattern(compiled_rules):
+    """
+    Groups the indexes of compiled rules by their shared pattern object.
+    Returns a list of (pattern, rule_indexes) in order of first appearance.
+    Rules without a pattern (their regex did not compile) are left out.
+    """
+    groups = {}
+    for rule_index, rule in enumerate(compiled_rules):
+        if rule["Pattern"] is None:
+            continue
+        groups.setdefault(id(rule["Pattern"]), (rule["Pattern"], []))[1].append(rule_index)
+    return list(groups.values())
+
+# Function to find regex constructs prone to catastrophic backtracking
+def lint_pattern(pattern):
+    """
+    Statically checks a pattern for constructs that can make the backtracking engine
+    take exponential time, such as '(a+)+' or '(\\w+\\s?)*'. A group is flagged when it
+    contains an unbounded quantifier and is itself repeated without bound.
+    Returns a list of warning messages; an empty list means nothing was found.
+    """
+    pattern = str(pattern or "")
+    if pattern in _lint_warnings:
+        return list(_lint_warnings[pattern])
+    try:
+        re.compile(pattern)
+    except re.error as e:
+        return [f"does not compile: {e}"]
+
+    warnings = []
+    # Each open group records where it starts and whether it repeats without bound inside
+    groups = [{"start": 0, "unbounded": False}]
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        atom_unbounded = False
+        group = None
+        if char == "\\":
+            i += 2
+            if pattern[i - 1:i] in ("p", "P") and pattern[i:i + 1] == "{":
+                i = pattern.find("}", i) + 1 or len(pattern)
+        elif char == "[":
+            # Skip the character class, allowing a literal ] first
+            i += 1
+            if pattern[i:i + 1] == "^":
+                i += 1
+            if pattern[i:i + 1] == "]":
+                i += 1
+            while i < len(pattern) and pattern[i] != "]":
+                i += 2 if pattern[i] == "\\" else 1
+            i += 1
+        elif char == "(":
+            groups.append({"start": i, "unbounded": False})
+            i += 1
+            continue
+        elif char == ")" and len(groups) > 1:
+            group = groups.pop()
+            atom_unbounded = group["unbounded"]
+            i += 1
+        else:
+            i += 1
+
+        # Look at the quantifier that follows the atom, if any
+        quantifier = UNBOUNDED_QUANTIFIER.match(pattern, i)
+        if quantifier:
+            if group is not None and group["unbounded"]:
+                warnings.append(f"nested unbounded quantifier in "
+                                f"'{pattern[group['start']:quantifier.end()]}' may backtrack catastrophically")
+            atom_unbounded = True
+            i = quantifier.end()
+        if atom_unbounded:
+            groups[-1]["unbounded"] = True
+    return warnings
+
+def lint_rules(validation_rules):
+    """Returns (field name, warning) pairs for every flagged pattern in a list of validation rules."""
+    return [(rule.get("Technical Field Name", ""), warning)
+            for rule in validation_rules
+            for warning in lint_pattern(rule.get("Regex", ""))]
+
+def duplicate_patterns(validation_rules):
+    """Returns each canonical pattern used by more than one rule, with the fields that use it."""
+    fields = {}
+    for rule in validation_rules:
+        fields.setdefault(canonical_pattern(rule.get("Regex", "")), []).append(rule.get("Technical Field Name", ""))
+    return {pattern: names for pattern, names in fields.items() if len(names) > 1}
+
+def bundle_extras(document):
+    """
+    Returns the fast-path plan of every distinct canonical pattern and the lint
+    warnings of every distinct pattern in a parsed validation rules file, to be
+    stored in its rule bundle (see rule_bundle).
+    """
+    patterns = {str(rule.get("Regex", "") or "") for rule in document.get("validation_rules", [])}
+    return {
+        "plans": {key: classify_pattern(key) for key in {canonical_pattern(pattern) for pattern in patterns}},
+        "warnings": {pattern: lint_pattern(pattern) for pattern in patterns},
+    }
+
+def register_extras(extras):
+    """Adds the plans and lint warnings of a rule bundle to the registry, so they are not worked out again."""
+    for key, plan in extras["plans"].items():
+        _fast_plans.setdefault(key, plan)
+    _lint_warnings.update(extras["warnings"])
+
+# ---------------- Main Execution ----------------
+def main():
+    parser = argparse.ArgumentParser(description="Report shared and potentially slow patterns in validation rules")
+    parser.add_argument("--input_yaml", default="validation_rules.yaml", help="Path to the validation rules YAML file")
+    args = parser.parse_args()
+
+    with open(args.input_yaml, "r", encoding="utf-8") as f:
+        validation_rules = yaml.safe_load(f).get("validation_rules", [])
+
+    print(f"{len(validation_rules)} rules, {len({canonical_pattern(rule.get('Regex', '')) for rule in validation_rules})} distinct patterns")
+    for pattern, names in duplicate_patterns(validation_rules).items():
+        print(f"Shared pattern {pattern!r}: {', '.join(names)}")
+    for field_name, warning in lint_rules(validation_rules):
+        print(f"Warning: {field_name}: {warning}")
+    for rule in validation_rules:
+        plan = classify_pattern(canonical_pattern(rule.get("Regex", "")))
+        if plan is not None:
+            print(f"Fast path ({plan[0]}): {rule.get('Technical Field Name', '')}: {rule.get('Regex', '')}")
+
+if __name__ == "__main__":
+    main()
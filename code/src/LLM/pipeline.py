@@ -0,0 +1,107 @@
+import time
+import argparse
+from contextlib import contextmanager
+from .PdfToCsv_New import extract_table_from_pdf, merge_continuation_rows, extract_rules_from_table_data, save_rules_to_yaml
+from .regExpollama import generate_validation_rules, save_results_to_yaml, save_manifest
+from .regex_cache import RegexCache
+from .fake_ollama import FakeAsyncClient
+from .validateDataYaml import validate_data, save_validation_report, stream_validation_report, RuleCosts
+from .. import profiling
+
+@contextmanager
+def timed_stage(stage_times, stage):
+    """Records the wall time spent inside the block under the stage name, and a profiling span."""
+    start_time = time.perf_counter()
+    try:
+        with profiling.span(stage):
+            yield
+    finally:
+        stage_times[stage] = time.perf_counter() - start_time
+
+def print_stage_times(stage_times):
+    """Prints the wall time of each pipeline stage and the total."""
+    print("\nPipeline stage timings:")
+    for stage, seconds in stage_times.items():
+        print(f"  {stage:<20} {seconds:8.2f}s")
+    print(f"  {'total':<20} {sum(stage_times.values()):8.2f}s")
+
+def run_pipeline(rules_pdf, data_csv, report_csv, rules_yaml=None, validation_yaml=None, cache=None,
+                 concurrency=1, client=None, workers=1, chunksize=None):
+    """
+    Runs PDF rule extraction, regex generation and data validation in one process.
+    Rules are passed between stages in memory; rules_yaml and validation_yaml are
+    only written when given. Returns the wall time of each stage in seconds.
+    """
+    stage_times = {}
+
+    # 1. Extract the rules from the PDF.
+    with timed_stage(stage_times, "extract_rules"):
+        table_data = extract_table_from_pdf(rules_pdf, workers)
+        rules = extract_rules_from_table_data(merge_continuation_rows(table_data))
+        if rules_yaml:
+            save_rules_to_yaml(rules, rules_yaml)
+    if not rules:
+        print("No table data extracted from the PDF.")
+        return stage_times
+
+    # 2. Generate a validation rule for each extracted rule.
+    with timed_stage(stage_times, "generate_regexes"):
+        validation_rules, _ = generate_validation_rules(rules, cache, concurrency, client)
+        if validation_yaml:
+            save_results_to_yaml(validation_rules, validation_yaml)
+            save_manifest(rules, validation_yaml)
+
+    # 3. Validate the data against the generated rules, quarantining any regex that stalls.
+    costs = RuleCosts()
+    with timed_stage(stage_times, "validate_data"):
+        if chunksize:
+            if not stream_validation_report(data_csv, validation_rules, report_csv, chunksize, workers, costs):
+                print("No validation errors found.")
+        else:
+            errors_df = validate_data(data_csv, validation_rules, workers, costs)
+            if not errors_df.empty:
+                save_validation_report(errors_df, report_csv)
+            else:
+                print("No validation errors found.")
+    costs.print_summary()
+
+    return stage_times
+
+# ---------------- Main Execution ----------------
+def main():
+    parser = argparse.ArgumentParser(description="Extract rules from a PDF, generate regexes and validate a CSV")
+    parser.add_argument("--rules_pdf", required=True, help="Path to the regulatory instructions PDF")
+    parser.add_argument("--input_csv", required=True, help="Path to the input CSV file")
+    parser.add_argument("--output_csv", required=True, help="Path to the report CSV file")
+    parser.add_argument("--rules_yaml", default=None, help="Also save the extracted rules to this YAML file")
+    parser.add_argument("--validation_yaml", default=None, help="Also save the validation rules to this YAML file")
+    parser.add_argument("--cache", default="regex_cache.sqlite", help="Path to the generated regex cache")
+    parser.add_argument("--no_cache", action="store_true", help="Always call the LLM, bypassing the cache")
+    parser.add_argument("--concurrency", type=int, default=1, help="Number of concurrent LLM requests")
+    parser.add_argument("--fake_llm", action="store_true", help="Use a fake async client instead of a real model (disables the cache)")
+    parser.add_argument("--workers", type=int, default=1, help="Number of processes for PDF extraction and validation")
+    parser.add_argument("--chunksize", type=int, default=None, help="Stream the input CSV in chunks of this many rows")
+    parser.add_argument("--trace", default=None,
+                        help="Record stage, page, LLM call and rule timing spans to this Chrome trace JSON file")
+    args = parser.parse_args()
+    if args.trace:
+        profiling.enable()
+
+    # Fake answers must never end up in the cache used for real runs
+    cache = None if args.no_cache or args.fake_llm else RegexCache(args.cache)
+    client = FakeAsyncClient() if args.fake_llm else None
+    try:
+        stage_times = run_pipeline(args.rules_pdf, args.input_csv, args.output_csv, args.rules_yaml,
+                                   args.validation_yaml, cache, args.concurrency, client, args.workers, args.chunksize)
+    finally:
+        if cache is not None:
+            cache.close()
+    print_stage_times(stage_times)
+    if args.trace:
+        profiler = profiling.disable()
+        profiler.print_summary()
+        profiler.save_trace(args.trace)
+    print("Pipeline execution completed.")
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,27 @@
 import os
 import re
+import json
+import copy
+import hashlib
 import yaml
-import ollama  # Use Ollama for local LLM execution
+import time
+import asyncio
+import argparse
+from collections import Counter
+from .regex_cache import RegexCache, make_cache_key
+from .fake_ollama import FakeAsyncClient
+from .pattern_registry import lint_pattern
+from ..value_sets import rule_value_set
+from ..rule_bundle import load_rules_document
+from .. import profiling
+from ..lazy_imports import lazy_import
 
-# Function to generate validation regex using Mistral-7B
-def generate_validation_regex(description, allowable_values):
-    """
-    Uses Ollama's Mistral-7B model to generate a regex validation pattern 
-    based on the field description and allowable values.
-    """
-    prompt = f"""
+# Use Ollama for local LLM execution; loaded on first use, as only uncached rules need it
+ollama = lazy_import("ollama")
+
+MODEL = 'mistral'
+
+PROMPT_TEMPLATE = """
     You are an expert in data validation and regular expressions.
     Generate a strict and optimized regex pattern for data validation.
 
@@ -27,14 +39,104 @@ def generate_validation_regex(description, allowable_values):
     - Just the regex pattern.
     """
 
-    response = ollama.chat(model='mistral', messages=[{'role': 'user', 'content': prompt}])
+# Function to generate validation regex using Mistral-7B
+def generate_validation_regex(description, allowable_values, cache=None):
+    """
+    Uses Ollama's Mistral-7B model to generate a regex validation pattern 
+    based on the field description and allowable values.
+    If a RegexCache is given, a previously generated regex for the same model,
+    prompt and rule text is returned without calling the model.
+    """
+    if cache is not None:
+        cache_key = make_cache_key(MODEL, PROMPT_TEMPLATE, description, allowable_values)
+        regex = cache.get(cache_key)
+        if regex is not None:
+            return regex
+
+    prompt = PROMPT_TEMPLATE.format(description=description, allowable_values=allowable_values)
+
+    with profiling.span(MODEL, "llm"):
+        response = ollama.chat(model=MODEL, messages=[{'role': 'user', 'content': prompt}])
+    regex = clean_regex_response(response)
+
+    if cache is not None:
+        cache.put(cache_key, MODEL, regex)
+
+    return regex
+
+# Function to extract the regex from an Ollama chat response
+def clean_regex_response(response):
+    """
+    Returns the regex text of a chat response without surrounding whitespace or quotes.
+    """
     regex = str(response['message']['content']).strip()
 
     # Remove extra quotes if any
-    regex = re.sub(r'^"|"$', '', regex)  
+    return re.sub(r'^"|"$', '', regex)
+
+# Function to generate validation regex using the Ollama async client
+async def generate_validation_regex_async(client, semaphore, description, allowable_values,
+                                          cache=None, timeout=120, retries=3, backoff=1.0, lane=None):
+    """
+    Async counterpart of generate_validation_regex. At most as many requests as the
+    semaphore allows are in flight at once. Each request is bounded by timeout seconds
+    and retried up to retries times, waiting backoff, 2*backoff, ... seconds in between.
+    When profiling, each request is a span on the given trace lane, since requests overlap.
+    """
+    if cache is not None:
+        cache_key = make_cache_key(MODEL, PROMPT_TEMPLATE, description, allowable_values)
+        regex = cache.get(cache_key)
+        if regex is not None:
+            return regex
 
+    prompt = PROMPT_TEMPLATE.format(description=description, allowable_values=allowable_values)
+
+    for attempt in range(retries + 1):
+        try:
+            async with semaphore:
+                with profiling.span(MODEL, "llm", lane, retry=attempt):
+                    response = await asyncio.wait_for(
+                        client.chat(model=MODEL, messages=[{'role': 'user', 'content': prompt}]), timeout)
+            break
+        except Exception as error:
+            if attempt == retries:
+                raise
+            delay = backoff * 2 ** attempt
+            print(f"Regex generation failed ({error!r}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    regex = clean_regex_response(response)
+    if cache is not None:
+        cache.put(cache_key, MODEL, regex)
     return regex
 
+# Function to generate regexes for many rules concurrently
+async def generate_validation_regexes(rules, client=None, concurrency=4, cache=None, timeout=120, retries=3):
+    """
+    Generates a regex for every rule with up to concurrency requests in flight.
+    Returns the regexes in the same order as the rules.
+    """
+    client = client or ollama.AsyncClient()
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = [
+        generate_validation_regex_async(client, semaphore, rule.get("Description", ""),
+                                        rule.get("Allowable Values", ""), cache, timeout, retries, lane=i + 1)
+        for i, rule in enumerate(rules)
+    ]
+    return await asyncio.gather(*tasks)
+
+# Function to build the regex of a rule with a closed list of values
+def value_set_regex(rule):
+    """
+    Returns an alternation of the values a rule's value set allows, or None if the
+    rule has no value set and its regex must come from the LLM. The validator checks
+    such alternations by set membership.
+    """
+    value_set = rule_value_set(rule)
+    if value_set is None:
+        return None
+    return "^(?:" + "|".join(re.escape(value) for value in sorted(value_set)) + ")$"
+
 # Function to check if a column is mandatory
 def is_column_mandatory(description):
     """
@@ -56,10 +158,10 @@ def generate_anomaly_message(technical_field_name, description, allowable_values
 # Function to load YAML file
 def load_yaml(yaml_path):
     """
-    Loads field definitions from a YAML file.
+    Loads field definitions from a YAML file, or from its compiled bundle
+    (see rule_bundle) when that is up to date.
     """
-    with open(yaml_path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
+    data, _ = load_rules_document(yaml_path)
     return data.get("rules", [])
 
 # Function to save results to a YAML file
@@ -72,22 +174,54 @@ def save_results_to_yaml(results, output_yaml):
         yaml.dump(data, outfile, sort_keys=False, default_flow_style=False)
     print(f"Validation rules saved to {output_yaml}")
 
-# ---------------- Main Execution ----------------
-if __name__ == "__main__":
-    #input_yaml = "C://Narasimha//Personal//Hackathon//rules.yaml"  # Update path
-    #output_yaml = "C://Narasimha//Personal//Hackathon//validation_rules.yaml"  # Output file
-    input_yaml = "rules.yaml"  # Update path
-    output_yaml = "validation_rules.yaml"  # Output file
-
-    rules = load_yaml(input_yaml)
+# Function to generate the validation rules for a list of extracted rules
+def generate_validation_rules(rules, cache=None, concurrency=1, client=None, timeout=120, retries=3,
+                              previous_validations=None):
+    """
+    Generates a validation rule (regex, mandatory flag and anomaly message) for every rule.
+    With concurrency above 1, or when an async client is given, regexes are generated
+    concurrently. Rules whose content hash matches an entry in previous_validations
+    (as returned by load_previous_validations) are carried forward unchanged; rules
+    that share their rule_key with another rule are always regenerated.
+    Returns the validation rules in input order and the number of regexes generated.
+    """
     validation_results = []
 
+    # Carry forward the validations of rules whose inputs have not changed
+    carried_forward = {}
+    if previous_validations is not None:
+        key_counts = Counter(rule_key(rule) for rule in rules)
+        for rule in rules:
+            key = rule_key(rule)
+            content_hash, previous_result = previous_validations.get(key, (None, None))
+            if key_counts[key] == 1 and content_hash == rule_content_hash(rule):
+                carried_forward[key] = previous_result
+        print(f"Carrying forward {len(carried_forward)} of {len(rules)} rules unchanged")
+    # Rules with a closed value set get their regex from the set, without an LLM call
+    changed_rules = [rule for rule in rules
+                     if rule_key(rule) not in carried_forward and value_set_regex(rule) is None]
+
+    if concurrency > 1 or client is not None:
+        regexes = asyncio.run(generate_validation_regexes(changed_rules, client, concurrency, cache,
+                                                          timeout, retries))
+    else:
+        regexes = [generate_validation_regex(rule.get("Description", ""), rule.get("Allowable Values", ""), cache)
+                   for rule in changed_rules]
+
+    # Regexes come back in the same order as changed_rules
+    new_regexes = iter(regexes)
+
     for rule in rules:
         technical_field_name = rule.get("Technical Field Name", "").replace(" ", "_")  # Remove spaces in field name
+        if rule_key(rule) in carried_forward:
+            # A copy, so that yaml.dump never writes the same rule as an anchor and alias
+            validation_results.append(copy.deepcopy(carried_forward[rule_key(rule)]))
+            continue
+
+        regex = value_set_regex(rule) or next(new_regexes)
         description = rule.get("Description", "")
         allowable_values = rule.get("Allowable Values", "")
 
-        regex = generate_validation_regex(description, allowable_values)
         is_mandatory = is_column_mandatory(description)
         anomaly_message = generate_anomaly_message(technical_field_name, description, allowable_values)
 
@@ -101,6 +235,121 @@ if __name__ == "__main__":
         print(f"Generated Validation for: {technical_field_name}")
         print(f"  - Is Mandatory: {is_mandatory}")
         print(f"  - Regex: {regex}")
-        print(f"  - Anomaly Message: {anomaly_message}\n")
+        print(f"  - Anomaly Message: {anomaly_message}")
+        for warning in lint_pattern(regex):
+            print(f"  - Warning: {warning}")
+        print()
+
+    return validation_results, len(regexes)
+
+# Function to identify a rule across runs
+def rule_key(rule):
+    """
+    Returns the (Technical Field Name, Field No.) pair a rule is matched on between
+    runs. Names alone are not unique: the PDF extraction gives several rules an empty
+    Technical Field Name.
+    """
+    return rule.get("Technical Field Name", "").replace(" ", "_"), str(rule.get("Field No.") or "")
+
+# Function to fingerprint a rule's inputs
+def rule_content_hash(rule):
+    """
+    Returns a SHA-256 of the rule text the generated validation depends on.
+    """
+    digest = hashlib.sha256()
+    for key in ("Technical Field Name", "Description", "Allowable Values"):
+        digest.update(str(rule.get(key) or "").encode("utf-8"))
+        digest.update(b"\0")
+    # Only rules with a value set hash it, so the hashes of other rules stay the same
+    for key in ("Value Set", "Value Set Codes", "Value Set Reference"):
+        if rule.get(key):
+            digest.update(f"{key}={rule[key]}".encode("utf-8"))
+            digest.update(b"\0")
+    return digest.hexdigest()
+
+# Function to locate the manifest of a validation rules file
+def manifest_path(output_yaml):
+    """
+    Returns the path of the manifest recording which rule inputs produced a validation rules file.
+    """
+    return os.path.splitext(output_yaml)[0] + ".manifest.json"
+
+# Function to load the validations generated by a previous run
+def load_previous_validations(output_yaml):
+    """
+    Returns {rule_key: (content hash, validation rule)} for a previous run, or an empty
+    dictionary if the run left no validation rules file or no manifest matching it.
+    Keys that several rules of the previous run shared are left out.
+    """
+    if not (os.path.exists(output_yaml) and os.path.exists(manifest_path(output_yaml))):
+        return {}
+    with open(manifest_path(output_yaml), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    with open(output_yaml, "r", encoding="utf-8") as f:
+        previous_results = (yaml.safe_load(f) or {}).get("validation_rules", [])
+    # The manifest lists the rules in the order their validation rules were saved
+    entries = manifest.get("rules") if isinstance(manifest, dict) else None
+    if entries is None or len(entries) != len(previous_results):
+        return {}
+    keys = [(entry["Technical Field Name"], entry["Field No."]) for entry in entries]
+    key_counts = Counter(keys)
+    return {key: (entry["content_hash"], result)
+            for key, entry, result in zip(keys, entries, previous_results) if key_counts[key] == 1}
+
+# Function to save the manifest of a validation rules file
+def save_manifest(rules, output_yaml):
+    """
+    Records the key and content hash of every rule used to produce a validation rules
+    file, in the same order as the validation rules.
+    """
+    entries = []
+    for rule in rules:
+        technical_field_name, field_no = rule_key(rule)
+        entries.append({"Technical Field Name": technical_field_name, "Field No.": field_no,
+                        "content_hash": rule_content_hash(rule)})
+    with open(manifest_path(output_yaml), "w", encoding="utf-8") as f:
+        json.dump({"rules": entries}, f, indent=2)
+
+# ---------------- Main Execution ----------------
+def main():
+    #input_yaml = "C://Narasimha//Personal//Hackathon//rules.yaml"  # Update path
+    #output_yaml = "C://Narasimha//Personal//Hackathon//validation_rules.yaml"  # Output file
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--input_yaml", default="rules.yaml", help="Path to the extracted rules YAML file")
+    parser.add_argument("--output_yaml", default="validation_rules.yaml", help="Path to the validation rules YAML file")
+    parser.add_argument("--cache", default="regex_cache.sqlite", help="Path to the generated regex cache")
+    parser.add_argument("--no_cache", action="store_true", help="Always call the LLM, bypassing the cache")
+    parser.add_argument("--cache_max_entries", type=int, default=None, help="Number of cached regexes to keep")
+    parser.add_argument("--cache_max_age_days", type=float, default=None, help="Evict cached regexes older than this")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Number of concurrent LLM requests; above 1 the async client is used")
+    parser.add_argument("--timeout", type=float, default=120, help="Seconds to wait for each async LLM request")
+    parser.add_argument("--retries", type=int, default=3, help="Times to retry a failed async LLM request")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only regenerate rules that are new or changed since the previous run")
+    parser.add_argument("--fake_llm", action="store_true", help="Use a fake async client instead of a real model (disables the cache)")
+    args = parser.parse_args()
+    input_yaml = args.input_yaml
+    output_yaml = args.output_yaml
+    # Fake answers must never end up in the cache used for real runs
+    cache = None if args.no_cache or args.fake_llm else RegexCache(args.cache, args.cache_max_entries, args.cache_max_age_days)
+
+    rules = load_yaml(input_yaml)
+    previous_validations = load_previous_validations(output_yaml) if args.incremental else None
+    client = FakeAsyncClient() if args.fake_llm else None
+
+    start_time = time.perf_counter()
+    validation_results, generated = generate_validation_rules(rules, cache, args.concurrency, client, args.timeout,
+                                                              args.retries, previous_validations)
+    elapsed = time.perf_counter() - start_time
 
     save_results_to_yaml(validation_results, output_yaml)
+    save_manifest(rules, output_yaml)
+    print(f"Generated {generated} regexes in {elapsed:.2f}s ({generated / max(elapsed, 1e-9):.1f} rules/sec)")
+
+    if cache is not None:
+        print(f"Regex cache: {cache.hits} hits, {cache.misses} LLM calls")
+        cache.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import argparse
+import hashlib
+import sqlite3
+import time
+
+# Function to build a cache key
+def make_cache_key(model, prompt_template, description, allowable_values):
+    """
+    Builds a content-addressed key from everything that determines the LLM's answer:
+    the model name, the prompt template and the rule text.
+    """
+    digest = hashlib.sha256()
+    for part in (model, prompt_template, description, allowable_values):
+        digest.update(str(part or "").encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class RegexCache:
+    """
+    On-disk SQLite cache of LLM-generated regexes, keyed by make_cache_key.
+    Entries can be evicted by count (least recently used first) or by age.
+    Hits are recorded in memory and written in one transaction by evict or close,
+    so that lookups do not each commit.
+    """
+
+    def __init__(self, cache_path="regex_cache.sqlite", max_entries=None, max_age_days=None):
+        self.cache_path = cache_path
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self.hits = 0
+        self.misses = 0
+        # Time of the latest hit on each key not yet written to last_used_at
+        self.touched = {}
+        self.connection = sqlite3.connect(cache_path)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS regex_cache (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                regex TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL
+            )
+        """)
+        self.connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get(self, key):
+        """Returns the cached regex for a key, or None on a miss."""
+        row = self.connection.execute("SELECT regex FROM regex_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.touched[key] = time.time()
+        return row[0]
+
+    def flush_touches(self):
+        """Writes the last_used_at of every key hit since the last flush and commits."""
+        if self.touched:
+            self.connection.executemany("UPDATE regex_cache SET last_used_at = ? WHERE key = ?",
+                                        [(used_at, key) for key, used_at in self.touched.items()])
+            self.touched.clear()
+        self.connection.commit()
+
+    def put(self, key, model, regex):
+        """Stores a generated regex under a key."""
+        now = time.time()
+        self.connection.execute(
+            "INSERT OR REPLACE INTO regex_cache (key, model, regex, created_at, last_used_at) VALUES (?, ?, ?, ?, ?)",
+            (key, model, regex, now, now))
+        self.connection.commit()
+
+    def evict(self, max_entries=None, max_age_days=None):
+        """
+        Removes entries older than max_age_days, then the least recently used
+        entries beyond max_entries. Returns the number of entries removed.
+        """
+        self.flush_touches()
+        removed = 0
+        if max_age_days is not None:
+            cutoff = time.time() - max_age_days * 86400
+            removed += self.connection.execute("DELETE FROM regex_cache WHERE created_at < ?", (cutoff,)).rowcount
+        if max_entries is not None:
+            removed += self.connection.execute("""
+                DELETE FROM regex_cache WHERE key NOT IN (
+                    SELECT key FROM regex_cache ORDER BY last_used_at DESC LIMIT ?
+                )
+            """, (max_entries,)).rowcount
+        self.connection.commit()
+        return removed
+
+    def invalidate(self, model=None):
+        """Removes every entry, or only the entries generated by one model. Returns the number removed."""
+        if model is None:
+            removed = self.connection.execute("DELETE FROM regex_cache").rowcount
+        else:
+            removed = self.connection.execute("DELETE FROM regex_cache WHERE model = ?", (model,)).rowcount
+        self.connection.commit()
+        return removed
+
+    def stats(self):
+        """Returns the number of cached entries per model."""
+        return dict(self.connection.execute("SELECT model, COUNT(*) FROM regex_cache GROUP BY model").fetchall())
+
+    def close(self):
+        """Writes pending hits, applies the configured eviction limits and closes the database."""
+        self.flush_touches()
+        if self.max_entries is not None or self.max_age_days is not None:
+            self.evict(self.max_entries, self.max_age_days)
+        self.connection.close()
+
+# ---------------- Main Execution ----------------
+def main():
+    parser = argparse.ArgumentParser(description="Manage the cache of LLM-generated regexes")
+    parser.add_argument("--cache", default="regex_cache.sqlite", help="Path to the regex cache database")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    invalidate_parser = subparsers.add_parser("invalidate", help="Remove cached regexes")
+    invalidate_parser.add_argument("--model", default=None, help="Only remove regexes generated by this model")
+    evict_parser = subparsers.add_parser("evict", help="Remove old or least recently used regexes")
+    evict_parser.add_argument("--max_entries", type=int, default=None, help="Number of entries to keep")
+    evict_parser.add_argument("--max_age_days", type=float, default=None, help="Remove entries older than this")
+    subparsers.add_parser("stats", help="Show the number of cached regexes per model")
+    args = parser.parse_args()
+
+    with RegexCache(args.cache) as cache:
+        if args.command == "invalidate":
+            print(f"Removed {cache.invalidate(args.model)} cached regexes from {args.cache}")
+        elif args.command == "evict":
+            print(f"Evicted {cache.evict(args.max_entries, args.max_age_days)} cached regexes from {args.cache}")
+        else:
+            for model, count in cache.stats().items():
+                print(f"{model}: {count} cached regexes")
+
+if __name__ == "__main__":
+    main()
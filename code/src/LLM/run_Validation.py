@@ -1,8 +1,9 @@
-#TO run 
-# python run_Validation.py FedR.pdf corporateloans_sample.csv vali_report.csv >> data_profiling.log
+#TO run
+# python -m gaidp_deep_profi.LLM.run_Validation FedR.pdf corporateloans_sample.csv vali_report.csv >> data_profiling.log
 
-import subprocess
 import sys
+from .pipeline import run_pipeline, print_stage_times
+from .regex_cache import RegexCache
 
 
 
@@ -22,9 +23,9 @@ report_csv = sys.argv[3]  # Third argument
 #validation_results = "validation_results.csv"
 
 
-# Run scripts in sequence
-subprocess.run(["C:\\Narasimha\\Python\\PythonEnv\\Scripts\\python.exe", "PdfToCsv_New.py", "--rules_pdf", rules_pdf])
-subprocess.run(["C:\\Narasimha\\Python\\PythonEnv\\Scripts\\python.exe", "regExpollama.py"])
-subprocess.run(["C:\\Narasimha\\Python\\PythonEnv\\Scripts\\python.exe", "validateDataYaml.py", "--input_csv", data_csv,"--output_csv", report_csv])
+# Run all stages in this process, passing the rules between them in memory
+with RegexCache() as cache:
+    stage_times = run_pipeline(rules_pdf, data_csv, report_csv, cache=cache)
+print_stage_times(stage_times)
 
 print("Pipeline execution completed.")
@@ -1,68 +1,644 @@
 import regex as re  # Use 'regex' instead of 're'
-import yaml
-import pandas as pd
+import os
+import time
 import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from .pattern_registry import compile_pattern, fast_plan, group_by_pattern, lint_rules, register_extras
+from ..rule_bundle import load_rules_document
+from ..data_io import NA_VALUES, data_format, read_columns, read_frame, read_chunks, split_frame
+from .fast_patterns import plan_matches
+from .. import profiling
+from ..lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
 
 def load_yaml(yaml_path):
-    """Loads validation rules from a YAML file."""
-    with open(yaml_path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
+    """
+    Loads validation rules from a YAML file, or from its compiled bundle (see
+    rule_bundle) when that is up to date, along with the bundle's precomputed
+    pattern plans and lint warnings.
+    """
+    data, extras = load_rules_document(yaml_path)
+    if extras is not None:
+        register_extras(extras)
     return data.get("validation_rules", [])
 
-def validate_data(csv_path, validation_rules):
-    """Validates data in a CSV file based on regex rules and mandatory constraints."""
-    df = pd.read_csv(csv_path)  
-    validation_results = []
-
-    for index, row in df.iterrows():
-        row_errors = []
-        for rule in validation_rules:
-            column_name = rule.get("Technical Field Name", "").replace(" ", "_")  
-            regex_pattern = rule.get("Regex", "")
-            is_mandatory = rule.get("Is Mandatory", "Optional").lower()
-            anomaly_message = rule.get("Anomaly Message", f"Invalid data in {column_name}")
-
-            if column_name in df.columns:
-                value = str(row[column_name]).strip() if pd.notna(row[column_name]) else ""
-
-                # Check for missing mandatory fields
-                if is_mandatory == "mandatory" and value == "":
-                    row_errors.append({"Row": index + 1, "Column": column_name, "Anomaly Message": f"{column_name} is required"})
-                
-                # Validate regex if value exists
-                elif value and not re.fullmatch(regex_pattern, value):
-                    row_errors.append({"Row": index + 1, "Column": column_name, "Anomaly Message": anomaly_message})
-        
-        # Calculate anomaly score (number of failed validations per row)
-        anomaly_score = len(row_errors)
-        for error in row_errors:
-            error["Anomaly Score"] = anomaly_score  
-
-        validation_results.extend(row_errors)
-
-    return pd.DataFrame(validation_results)
+def compile_rules(validation_rules, columns, costs=None):
+    """
+    Compiles each validation rule that targets one of the given columns once,
+    into the form used by the columnar engine.
+    Returns a list of dictionaries, one per rule, in the original rule order.
+    A rule whose regex does not compile (e.g. a bad LLM answer) is quarantined in
+    costs and gets the fallback pattern or, by default, no pattern, so that only
+    its mandatory check runs.
+    """
+    compiled_rules = []
+    for rule in validation_rules:
+        column_name = rule.get("Technical Field Name", "").replace(" ", "_")
+        if column_name not in columns:
+            continue
+        try:
+            pattern = compile_pattern(rule.get("Regex", ""))
+        except re.error as error:
+            reason = f"invalid regex ({error})"
+            if costs is None:
+                print(f"Skipped regex for {column_name}: {reason}")
+                pattern = None
+            else:
+                costs.quarantine(str(rule.get("Regex", "")), [column_name], reason)
+                pattern = compile_pattern(FALLBACK_PATTERN) if costs.on_timeout == "fallback" else None
+        compiled_rules.append({
+            "Column": column_name,
+            "Pattern": pattern,
+            "Is Mandatory": rule.get("Is Mandatory", "Optional").lower() == "mandatory",
+            "Anomaly Message": rule.get("Anomaly Message", f"Invalid data in {column_name}"),
+        })
+    return compiled_rules
+
+def column_values(series):
+    """Converts a column to stripped strings, with missing values as empty strings."""
+    return series.astype(str).str.strip().where(series.notna(), "")
+
+def regex_failures(values, pattern, timeout=None):
+    """
+    Returns a boolean mask of the non-empty values that do not fully match the pattern.
+    Each distinct value is matched only once, with vectorised string methods when the
+    pattern has a fast-path plan. Raises TimeoutError if a single regex match takes
+    longer than timeout seconds.
+    """
+    codes, uniques = pd.factorize(values)
+    plan = fast_plan(pattern)
+    if plan is not None:
+        matched = plan_matches(uniques, plan)
+    else:
+        matched = np.fromiter((pattern.fullmatch(value, timeout=timeout) is not None for value in uniques),
+                              dtype=bool, count=len(uniques))
+    return (values != "").to_numpy() & ~matched[codes]
+
+# Seconds a single cell may spend in a rule's regex before the rule is quarantined
+MATCH_TIMEOUT = 1.0
+
+# Linear-time check used in place of a quarantined pattern with on_timeout="fallback":
+# the value must not contain a carriage return, line feed, comma or control character
+FALLBACK_PATTERN = r"[^\r\n,\p{Cc}]*"
+
+class RuleCosts:
+    """
+    Running regex cost of each pattern (seconds, cells matched), and the patterns
+    quarantined because a single cell exceeded match_timeout or the pattern's total
+    time exceeded rule_budget seconds. A quarantined pattern is skipped, or replaced
+    by FALLBACK_PATTERN when on_timeout is "fallback"; the mandatory check still runs.
+    Costs are keyed by pattern text so that they can be merged across worker processes.
+    """
+
+    def __init__(self, match_timeout=MATCH_TIMEOUT, rule_budget=None, on_timeout="skip"):
+        self.match_timeout = match_timeout
+        self.rule_budget = rule_budget
+        self.on_timeout = on_timeout
+        self.seconds = {}
+        self.cells = {}
+        self.columns = {}
+        self.quarantined = {}
+
+    def record(self, pattern, columns, seconds, cells):
+        """Adds the time spent matching cells of the given columns against a pattern."""
+        key = pattern.pattern
+        self.seconds[key] = self.seconds.get(key, 0.0) + seconds
+        self.cells[key] = self.cells.get(key, 0) + cells
+        self.columns.setdefault(key, set()).update(columns)
+        if self.rule_budget is not None and self.seconds[key] > self.rule_budget and key not in self.quarantined:
+            self.quarantine(key, columns, f"used {self.seconds[key]:.2f}s, over the {self.rule_budget}s budget")
+
+    def quarantine(self, key, columns, reason):
+        """Quarantines a pattern, given by its text, and reports it."""
+        self.quarantined[key] = reason
+        self.columns.setdefault(key, set()).update(columns)
+        print(f"Quarantined rule for {', '.join(sorted(columns))}: {reason}")
+
+    def replacement(self, pattern):
+        """
+        Returns the pattern to run for a rule: the pattern itself, the fallback
+        pattern if it is quarantined, or None if it is quarantined and skipped.
+        """
+        if pattern.pattern not in self.quarantined:
+            return pattern
+        return compile_pattern(FALLBACK_PATTERN) if self.on_timeout == "fallback" else None
+
+    def run(self, pattern, columns, cells, match):
+        """
+        Calls match(pattern, timeout) for a rule's pattern under the match timeout,
+        recording its cost over the given number of cells and quarantining the
+        pattern if it times out. A quarantined pattern is matched with the fallback
+        pattern and no timeout instead, and None is returned if it is skipped.
+        """
+        checked = self.replacement(pattern)
+        if checked is not pattern:
+            return None if checked is None else match(checked, None)
+
+        start_time = time.perf_counter()
+        try:
+            result = match(pattern, self.match_timeout)
+        except TimeoutError:
+            self.quarantine(pattern.pattern, columns, f"a single value took over {self.match_timeout}s to match")
+            return self.run(pattern, columns, cells, match)
+        self.record(pattern, columns, time.perf_counter() - start_time, cells)
+        return result
+
+    def empty_copy(self):
+        """Returns a RuleCosts with the same budgets and quarantined patterns but no recorded costs."""
+        costs = RuleCosts(self.match_timeout, self.rule_budget, self.on_timeout)
+        costs.quarantined = dict(self.quarantined)
+        costs.columns = {key: set(self.columns.get(key, ())) for key in self.quarantined}
+        return costs
+
+    def merge(self, other):
+        """Adds the costs and quarantined patterns recorded by another RuleCosts."""
+        for key, seconds in other.seconds.items():
+            self.seconds[key] = self.seconds.get(key, 0.0) + seconds
+        for key, cells in other.cells.items():
+            self.cells[key] = self.cells.get(key, 0) + cells
+        for key, columns in other.columns.items():
+            self.columns.setdefault(key, set()).update(columns)
+        self.quarantined.update(other.quarantined)
+
+    def print_summary(self, top=5):
+        """Prints the most expensive patterns and every quarantined pattern."""
+        print("\nRule costs:")
+        for key in sorted(self.seconds, key=self.seconds.get, reverse=True)[:top]:
+            print(f"  {self.seconds[key]:8.3f}s {self.cells[key]:>10} cells  "
+                  f"{', '.join(sorted(self.columns[key]))}: {key}")
+        for key, reason in self.quarantined.items():
+            action = "replaced by the fallback check" if self.on_timeout == "fallback" else "skipped"
+            print(f"  Quarantined ({action}) {', '.join(sorted(self.columns[key]))}: {key} - {reason}")
+
+def validate_frame(df, compiled_rules, row_offset=0, costs=None):
+    """
+    Validates a DataFrame column by column against compiled rules. Rules that share
+    a compiled pattern are matched together over their stacked columns.
+    Row numbers in the result are 1-based and start after row_offset.
+    With a RuleCosts, regex time is recorded and slow patterns are quarantined.
+    """
+    rows = np.arange(row_offset + 1, row_offset + len(df) + 1)
+    compiled_rules = [rule for rule in compiled_rules if rule["Column"] in df.columns]
+    values = {column_name: column_values(df[column_name])
+              for column_name in dict.fromkeys(rule["Column"] for rule in compiled_rules)}
+    failures = []
+
+    # Check for missing mandatory fields
+    for rule_index, rule in enumerate(compiled_rules):
+        if rule["Is Mandatory"]:
+            missing = (values[rule["Column"]] == "").to_numpy()
+            failures.append(pd.DataFrame({
+                "Row": rows[missing],
+                "Rule": rule_index,
+                "Column": rule["Column"],
+                "Anomaly Message": f"{rule['Column']} is required",
+            }))
+
+    # Validate regex where a value exists, running each distinct pattern
+    # once over the stacked values of every column that shares it
+    for pattern, rule_indexes in group_by_pattern(compiled_rules):
+        columns = [compiled_rules[rule_index]["Column"] for rule_index in rule_indexes]
+        stacked = pd.concat([values[column_name] for column_name in columns], ignore_index=True)
+        with profiling.span(", ".join(columns), "rule", pattern=pattern.pattern, cells=len(stacked)) as counters:
+            if costs is None:
+                invalid = regex_failures(stacked, pattern)
+            else:
+                invalid = costs.run(pattern, columns, len(stacked),
+                                    lambda checked, timeout: regex_failures(stacked, checked, timeout))
+            counters["failures"] = 0 if invalid is None else int(invalid.sum())
+        if invalid is None:
+            continue
+        invalid = invalid.reshape(len(rule_indexes), len(df))
+        for rule_index, rule_invalid in zip(rule_indexes, invalid):
+            failures.append(pd.DataFrame({
+                "Row": rows[rule_invalid],
+                "Rule": rule_index,
+                "Column": compiled_rules[rule_index]["Column"],
+                "Anomaly Message": compiled_rules[rule_index]["Anomaly Message"],
+            }))
+
+    return build_report(failures)
+
+def build_report(failures):
+    """
+    Combines DataFrames of failures (Row, Rule, Column, Anomaly Message) into the
+    validation report, ordered by row and then rule, with each row's anomaly score.
+    """
+    failures = [frame for frame in failures if not frame.empty]
+    if not failures:
+        return pd.DataFrame()
+
+    errors_df = pd.concat(failures, ignore_index=True)
+    errors_df = errors_df.sort_values(["Row", "Rule"], kind="stable", ignore_index=True)
+
+    # Calculate anomaly score (number of failed validations per row)
+    errors_df["Anomaly Score"] = errors_df.groupby("Row")["Row"].transform("size")
+    return errors_df.drop(columns="Rule")
+
+# Compiled rules and rule costs held by each worker process, sent once when the worker starts.
+_worker_rules = None
+_worker_costs = None
+
+def _init_worker(compiled_rules, costs, profile=False):
+    global _worker_rules, _worker_costs
+    _worker_rules = compiled_rules
+    _worker_costs = costs
+    if profile:
+        profiling.enable()
+
+def _validate_task(task):
+    row_offset, df = task
+    errors_df = validate_frame(df, _worker_rules, row_offset, _worker_costs)
+    return errors_df, os.getpid(), _worker_costs, profiling.drain()
+
+def validate_frames(frames, compiled_rules, workers=1, costs=None):
+    """
+    Validates (row offset, DataFrame) pairs, yielding one error DataFrame per frame
+    in input order. With more than one worker the frames are fanned out to a
+    process pool, keeping at most two frames per worker in flight. Each worker
+    applies the rule budgets of costs on its own, and the workers' running costs
+    are merged into costs once every frame is done, and their profiling spans
+    as each frame comes back.
+    """
+    if workers <= 1:
+        for row_offset, df in frames:
+            yield validate_frame(df, compiled_rules, row_offset, costs)
+        return
+
+    # Latest running costs reported by each worker process
+    worker_costs = {}
+
+    def collect(future):
+        errors_df, pid, running_costs, events = future.result()
+        worker_costs[pid] = running_costs
+        profiling.merge(events)
+        return errors_df
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(compiled_rules, costs and costs.empty_copy(), profiling.active() is not None)) as pool:
+        pending = deque()
+        for task in frames:
+            pending.append(pool.submit(_validate_task, task))
+            if len(pending) >= 2 * workers:
+                yield collect(pending.popleft())
+        while pending:
+            yield collect(pending.popleft())
+
+    if costs is not None:
+        for running_costs in worker_costs.values():
+            costs.merge(running_costs)
+
+def rule_columns(source, validation_rules, file_format=None):
+    """Returns the columns of the input file that are named in the rule set, in file order."""
+    targeted = {rule.get("Technical Field Name", "").replace(" ", "_") for rule in validation_rules}
+    return [column for column in read_columns(source, file_format) if column in targeted]
+
+def value_set_columns(compiled_rules):
+    """
+    Returns the columns whose rule pattern is a closed list of values, such as
+    ^(?:NAICS|SIC|GICS)$. Their cells are read as written, so a listed value or
+    country code such as "NA" is not taken for a missing value.
+    """
+    return {rule["Column"] for rule in compiled_rules
+            if rule["Pattern"] is not None and (fast_plan(rule["Pattern"]) or ("",))[0] == "enum"}
+
+def validate_data(input_path, validation_rules, workers=1, costs=None):
+    """
+    Validates data in a CSV, Parquet or Arrow IPC file based on regex rules and mandatory constraints.
+    Only the columns named in the rules are read.
+    """
+    columns = rule_columns(input_path, validation_rules)
+    compiled_rules = compile_rules(validation_rules, columns, costs)
+    df = read_frame(input_path, columns, text_columns=value_set_columns(compiled_rules))
+    if workers <= 1:
+        return validate_frame(df, compiled_rules, costs=costs)
+
+    results = [errors_df for errors_df in validate_frames(split_frame(df, workers * 4), compiled_rules, workers, costs)
+               if not errors_df.empty]
+    return pd.concat(results, ignore_index=True) if results else pd.DataFrame()
+
+def validate_data_chunks(input_path, validation_rules, chunksize, workers=1, costs=None):
+    """
+    Validates a CSV, Parquet or Arrow IPC file chunk by chunk, yielding one error
+    DataFrame per chunk. Row numbers stay global across chunks. CSV cells are read
+    as text, so results do not depend on where chunk boundaries fall.
+    """
+    columns = rule_columns(input_path, validation_rules)
+    compiled_rules = compile_rules(validation_rules, columns, costs)
+    frames = read_chunks(input_path, chunksize, columns, text_columns=value_set_columns(compiled_rules))
+    return validate_frames(frames, compiled_rules, workers, costs)
+
+# Fields pandas reads as missing by default; the mmap fast path treats them the same way.
+NA_FIELDS = frozenset(value.encode("ascii") for value in NA_VALUES)
+
+# Bytes str.strip() removes from ASCII text
+ASCII_WHITESPACE = b" \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f"
+
+# Bytes of the input scanned at a time by the mmap fast path
+MMAP_BLOCK_SIZE = 16 * 1024 * 1024
+
+# Bytes of padded cell values gathered at a time by the mmap fast path
+MMAP_GATHER_SIZE = 64 * 1024 * 1024
+
+# Longest cell the mmap fast path pads a column to; wider cells need the pandas parser
+MMAP_MAX_CELL_WIDTH = 256
+
+def compile_bytes_pattern(pattern):
+    """
+    Compiles a str regex for matching ASCII byte strings directly, or returns None
+    if the pattern has no bytes equivalent.
+    """
+    try:
+        return re.compile(pattern.pattern.encode("ascii"), pattern.flags & ~re.UNICODE)
+    except (UnicodeEncodeError, re.error, ValueError):
+        return None
+
+def cell_status(cell, is_mandatory, pattern, bytes_pattern, timeout=None, keep_na=False):
+    """
+    Returns 0 if a raw cell passes a rule, 1 if it is a missing mandatory value
+    and 2 if it does not match the pattern. A pattern of None accepts any value.
+    With keep_na, NA_FIELDS other than the empty field are checked as written.
+    """
+    cell = b"" if cell in NA_FIELDS and not keep_na else cell.strip(ASCII_WHITESPACE)
+    if not cell.isascii():
+        cell = cell.decode("utf-8").strip()
+    if not cell:
+        return 1 if is_mandatory else 0
+    if pattern is None:
+        return 0
+    if isinstance(cell, str):
+        return 0 if pattern.fullmatch(cell, timeout=timeout) else 2
+    if bytes_pattern is not None:
+        return 0 if bytes_pattern.fullmatch(cell, timeout=timeout) else 2
+    return 0 if pattern.fullmatch(cell.decode("ascii"), timeout=timeout) else 2
+
+def cell_statuses(uniques, is_mandatory, pattern, bytes_pattern, timeout=None, keep_na=False):
+    """Returns the cell_status of each distinct raw cell as an int8 array."""
+    return np.fromiter((cell_status(bytes(cell), is_mandatory, pattern, bytes_pattern, timeout, keep_na)
+                        for cell in uniques), dtype=np.int8, count=len(uniques))
+
+def mmap_line_blocks(data, start, block_size=MMAP_BLOCK_SIZE):
+    """
+    Yields (block, line_starts, line_ends) for a memory-mapped CSV file from start
+    onwards, where block is a zero-copy view of whole lines. Blank lines are left
+    out and line ends exclude the line break.
+    Yields None and stops if a block has a bare carriage return or a NUL byte.
+    """
+    while start < len(data):
+        block = data[start:start + block_size]
+        breaks = np.flatnonzero(block == ord("\n"))
+        if start + len(block) < len(data):
+            if len(breaks) == 0:
+                block_size *= 2  # a single line longer than the block
+                continue
+            block = block[:breaks[-1] + 1]
+        start += len(block)
+
+        returns = np.flatnonzero(block == ord("\r"))
+        next_bytes = block[np.minimum(returns + 1, len(block) - 1)]
+        if (returns + 1 >= len(block)).any() or (next_bytes != ord("\n")).any() or (block == 0).any():
+            yield None
+            return
+
+        line_starts = np.concatenate(([0], breaks + 1))
+        line_ends = np.concatenate((breaks, [len(block)]))
+        if len(returns):
+            line_ends -= block[np.maximum(line_ends - 1, 0)] == ord("\r")
+        keep = line_ends > line_starts
+        yield block, line_starts[keep], line_ends[keep]
+
+def line_commas(block, line_starts, line_ends):
+    """
+    Returns the comma positions in a block, with the block length appended, the index
+    of the first comma on each line and the number of commas on each line.
+    """
+    commas = np.append(np.flatnonzero(block == ord(",")), len(block))
+    first_comma = np.searchsorted(commas, line_starts)
+    return commas, first_comma, np.searchsorted(commas, line_ends) - first_comma
+
+def field_cells(block, line_starts, line_ends, comma_index, field_index):
+    """
+    Returns the cells of one field on each line as a numpy bytes array, padded to
+    the longest cell. Lines with too few fields give empty cells.
+    Returns None if a cell is longer than MMAP_MAX_CELL_WIDTH, since every cell
+    would be padded to it.
+    """
+    commas, first_comma, comma_counts = comma_index
+    if field_index == 0:
+        starts = line_starts
+    else:
+        starts = commas[np.minimum(first_comma + field_index - 1, len(commas) - 1)] + 1
+    ends = np.where(comma_counts > field_index,
+                    commas[np.minimum(first_comma + field_index, len(commas) - 1)], line_ends)
+    starts = np.where(comma_counts >= field_index, starts, ends)
+
+    lengths = ends - starts
+    width = max(int(lengths.max(initial=0)), 1)
+    if width > MMAP_MAX_CELL_WIDTH:
+        return None
+    cells = np.empty(len(starts), dtype=f"S{width}")
+    step = max(MMAP_GATHER_SIZE // width, 1)
+    offsets = np.arange(width)
+    for i in range(0, len(starts), step):
+        positions = starts[i:i + step, None] + offsets
+        gathered = np.where(offsets < lengths[i:i + step, None],
+                            block[np.minimum(positions, len(block) - 1)], 0).astype(np.uint8)
+        cells[i:i + step] = gathered.view(f"S{width}").ravel()
+    return cells
+
+def unique_cells(cells):
+    """
+    Returns the distinct cells of a numpy bytes array and the code of each cell.
+    Cells of up to 8 bytes are hashed as integers instead of being sorted.
+    """
+    if cells.dtype.itemsize > 8:
+        uniques, codes = np.unique(cells, return_inverse=True)
+        return uniques, codes.ravel()
+    codes, uniques = pd.factorize(cells.astype("S8").view("<u8"))
+    return uniques.view("S8"), codes
+
+def validate_csv_mmap(csv_path, validation_rules, costs=None):
+    """
+    Validates a CSV file without building a DataFrame of it. The file is memory-mapped,
+    line and field boundaries are found with numpy over the mapped bytes, and each rule
+    column is gathered straight from the mapping so that the regex runs once per
+    distinct raw cell. Strings are only decoded for cells with non-ASCII bytes.
+    Cells are checked as the text in the file, so numbers are not reformatted as they
+    are when pandas infers a numeric column.
+    Returns None if the file uses quoting (in the header or the data), bare carriage
+    returns, NUL bytes or a rule column cell longer than MMAP_MAX_CELL_WIDTH, which
+    need the pandas parser. With a RuleCosts, slow patterns are quarantined as in validate_frame.
+    """
+    if os.path.getsize(csv_path) == 0:
+        return None
+    data = np.memmap(csv_path, dtype=np.uint8, mode="r")
+    header_end = data[:1024 * 1024].tobytes().find(b"\n")
+    if header_end == -1:
+        return None
+
+    header = data[:header_end].tobytes().rstrip(b"\r")
+    header = header[3:] if header.startswith(b"\xef\xbb\xbf") else header
+    if b'"' in header:
+        return None
+    columns = header.decode("utf-8").split(",")
+    if len(set(columns)) != len(columns):
+        return None
+
+    compiled_rules = compile_rules(validation_rules, columns, costs)
+    text_columns = value_set_columns(compiled_rules)
+    checks = [(rule_index, columns.index(rule["Column"]), rule["Is Mandatory"], rule["Pattern"],
+               compile_bytes_pattern(rule["Pattern"]) if rule["Pattern"] is not None else None,
+               rule["Column"] in text_columns)
+              for rule_index, rule in enumerate(compiled_rules)]
+
+    failures = []
+    row_offset = 0
+    for lines in mmap_line_blocks(data, header_end + 1):
+        if lines is None:
+            return None
+        block, line_starts, line_ends = lines
+        if (block == ord('"')).any():
+            return None
+        comma_index = line_commas(block, line_starts, line_ends)
+        rows = np.arange(row_offset + 1, row_offset + len(line_starts) + 1)
+
+        for rule_index, field_index, is_mandatory, pattern, bytes_pattern, keep_na in checks:
+            column_name = compiled_rules[rule_index]["Column"]
+            with profiling.span(column_name, "rule", pattern=pattern and pattern.pattern,
+                                cells=len(line_starts)) as counters:
+                cells = field_cells(block, line_starts, line_ends, comma_index, field_index)
+                if cells is None:
+                    return None
+                uniques, codes = unique_cells(cells)
+                if costs is None or pattern is None:
+                    statuses = cell_statuses(uniques, is_mandatory, pattern, bytes_pattern, keep_na=keep_na)
+                else:
+                    # Cost is recorded per cell of the column, as in validate_frame
+                    statuses = costs.run(pattern, [column_name], len(line_starts), lambda checked, timeout: cell_statuses(
+                        uniques, is_mandatory, checked,
+                        bytes_pattern if checked is pattern else compile_bytes_pattern(checked), timeout, keep_na))
+                    if statuses is None:
+                        statuses = cell_statuses(uniques, is_mandatory, None, None, keep_na=keep_na)
+                status = statuses[codes]
+                counters["failures"] = int(np.count_nonzero(status == 2))
+
+            for code, message in ((1, f"{column_name} is required"),
+                                  (2, compiled_rules[rule_index]["Anomaly Message"])):
+                failed = status == code
+                if failed.any():
+                    failures.append(pd.DataFrame({
+                        "Row": rows[failed],
+                        "Rule": rule_index,
+                        "Column": column_name,
+                        "Anomaly Message": message,
+                    }))
+        row_offset += len(line_starts)
+
+    return build_report(failures)
+
+def report_schema():
+    """Returns the Arrow schema of a validation report, so every Parquet row group matches."""
+    import pyarrow as pa
+    return pa.schema([("Row", pa.int64()), ("Column", pa.string()),
+                      ("Anomaly Message", pa.string()), ("Anomaly Score", pa.int64())])
 
 def save_validation_report(errors_df, output_file):
-    """Saves validation errors to a CSV file."""
-    errors_df.to_csv(output_file, index=False)
+    """Saves validation errors to a CSV file, or a Parquet file if the name ends in .parquet."""
+    if data_format(output_file) == "parquet":
+        errors_df.to_parquet(output_file, index=False)
+    else:
+        errors_df.to_csv(output_file, index=False)
     print(f"Validation report saved to {output_file}")
 
+def stream_validation_report(input_path, validation_rules, output_file, chunksize, workers=1, costs=None):
+    """
+    Validates an input file in chunks, appending each chunk's errors to the report
+    as soon as they are found. The report is a Parquet file (one row group per
+    chunk with errors) if its name ends in .parquet and a CSV file otherwise, and
+    is only created once an error is found. Returns the total number of errors written.
+    """
+    parquet_writer = None
+    total_errors = 0
+    for errors_df in validate_data_chunks(input_path, validation_rules, chunksize, workers, costs):
+        if errors_df.empty:
+            continue
+        if data_format(output_file) == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(errors_df, schema=report_schema(), preserve_index=False)
+            parquet_writer = parquet_writer or pq.ParquetWriter(output_file, table.schema)
+            parquet_writer.write_table(table)
+        else:
+            errors_df.to_csv(output_file, mode="a" if total_errors else "w", header=not total_errors, index=False)
+        total_errors += len(errors_df)
+
+    if parquet_writer is not None:
+        parquet_writer.close()
+    if total_errors:
+        print(f"Validation report saved to {output_file}")
+    return total_errors
+
 # ----------- Main Execution -----------
-if __name__ == "__main__":
+def main():
     #yaml_file = "C://Narasimha//Personal//Hackathon//validation_rules.yaml"  
     #csv_file = "C://Narasimha//Personal//Hackathon//data.csv"  
     #output_file = "C://Narasimha//Personal//Hackathon//validation_report.csv"
     parser = argparse.ArgumentParser()
-    parser.add_argument("--input_csv", required=True, help="Path to the input CSV file")
-    parser.add_argument("--output_csv", required=True, help="Path to the report CSV file")
+    parser.add_argument("--input_csv", required=True, help="Path to the input CSV, Parquet or Arrow IPC file")
+    parser.add_argument("--output_csv", required=True, help="Path to the report CSV file, or a .parquet file")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="Stream the input in chunks of this many rows instead of loading it whole")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes to validate with")
+    parser.add_argument("--mmap", action="store_true",
+                        help="Scan an unquoted CSV file with the memory-mapped fast path instead of pandas")
+    parser.add_argument("--match_timeout", type=float, default=MATCH_TIMEOUT,
+                        help="Seconds a rule's regex may spend on one value before the rule is quarantined")
+    parser.add_argument("--rule_budget", type=float, default=None,
+                        help="Total seconds a rule's regex may spend before the rule is quarantined")
+    parser.add_argument("--on_timeout", choices=["skip", "fallback"], default="skip",
+                        help="Skip a quarantined rule's regex, or replace it with a basic printable-text check")
+    parser.add_argument("--trace", default=None,
+                        help="Record per-rule timing spans and save them to this Chrome trace JSON file")
     args = parser.parse_args()
+    if args.trace:
+        profiling.enable()
     yaml_file = "validation_rules.yaml"  
     csv_file = args.input_csv
     output_file = args.output_csv
     validation_rules = load_yaml(yaml_file)
-    errors_df = validate_data(csv_file, validation_rules)
+    for field_name, warning in lint_rules(validation_rules):
+        print(f"Warning: {field_name}: {warning}")
+
+    costs = RuleCosts(args.match_timeout, args.rule_budget, args.on_timeout)
+
+    errors_df = validate_csv_mmap(csv_file, validation_rules, costs) if args.mmap else None
+    if args.mmap and errors_df is None:
+        print("The input needs the pandas parser; falling back from the mmap fast path.")
 
-    if not errors_df.empty:
-        save_validation_report(errors_df, output_file)
+    if errors_df is not None:
+        if not errors_df.empty:
+            save_validation_report(errors_df, output_file)
+        else:
+            print("No validation errors found.")
+    elif args.chunksize:
+        if not stream_validation_report(csv_file, validation_rules, output_file, args.chunksize, args.workers, costs):
+            print("No validation errors found.")
     else:
-        print("No validation errors found.")
+        errors_df = validate_data(csv_file, validation_rules, args.workers, costs)
+
+        if not errors_df.empty:
+            save_validation_report(errors_df, output_file)
+        else:
+            print("No validation errors found.")
+
+    costs.print_summary()
+    if args.trace:
+        profiler = profiling.disable()
+        profiler.print_summary()
+        profiler.save_trace(args.trace)
+
+if __name__ == "__main__":
+    main()
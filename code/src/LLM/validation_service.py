@@ -0,0 +1,223 @@
+import os
+import itertools
+import json
+import hashlib
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import yaml
+from .pattern_registry import lint_rules
+from .validateDataYaml import load_yaml, compile_rules, validate_frames, rule_columns, value_set_columns, RuleCosts
+from ..data_io import read_chunks
+from ..lazy_imports import lazy_import
+
+# Loaded on first use, so --help stays quick; make_server loads it before any request
+pd = lazy_import("pandas")
+
+# Rows validated and streamed back at a time
+DEFAULT_CHUNKSIZE = 100_000
+
+# Header of the streamed report, the columns of save_validation_report's CSV
+REPORT_HEADER = "Row,Column,Anomaly Message,Anomaly Score\n"
+
+
+class RuleSet:
+    """Validation rules loaded from one YAML file, with their compiled forms per set of data columns."""
+
+    def __init__(self, source_hash, validation_rules):
+        self.source_hash = source_hash
+        self.validation_rules = validation_rules
+        self.compiled = {}
+        # Patterns quarantined by earlier requests stay quarantined for later ones
+        self.costs = RuleCosts()
+        self.lock = threading.Lock()
+
+    def compiled_rules(self, columns):
+        """
+        Returns compile_rules for the given data columns, compiling them once per distinct
+        header. Rules whose regex does not compile are quarantined for every later request.
+        """
+        key = tuple(columns)
+        with self.lock:
+            if key not in self.compiled:
+                self.compiled[key] = compile_rules(self.validation_rules, columns, self.costs)
+            return self.compiled[key]
+
+    def request_costs(self):
+        """Returns a RuleCosts for one request, starting from the patterns quarantined so far."""
+        with self.lock:
+            return self.costs.empty_copy()
+
+    def merge_costs(self, costs):
+        """Adds the costs and quarantined patterns of a finished request."""
+        with self.lock:
+            self.costs.merge(costs)
+
+
+def file_hash(path):
+    """Returns the SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class RuleSetCache:
+    """
+    Validation rule sets kept in memory, keyed by the hash of their YAML file so
+    that files with the same contents share one RuleSet. A file is stat-ed on every
+    lookup and re-hashed when its size or modification time changes; if the contents
+    changed, the new rules are loaded and used from then on (hot reload).
+    """
+
+    def __init__(self):
+        self.rule_sets = {}
+        self.files = {}
+        self.lock = threading.Lock()
+
+    def get(self, rules_path):
+        """Returns the RuleSet of a validation rules YAML file, loading it if it is new or changed."""
+        rules_path = os.path.abspath(rules_path)
+        stat = os.stat(rules_path)
+        signature = (stat.st_size, stat.st_mtime_ns)
+        with self.lock:
+            known = self.files.get(rules_path)
+            if known is not None and known[0] == signature:
+                return self.rule_sets[known[1]]
+
+            source_hash = file_hash(rules_path)
+            if source_hash not in self.rule_sets:
+                validation_rules = load_yaml(rules_path)
+                for field_name, warning in lint_rules(validation_rules):
+                    print(f"Warning: {field_name}: {warning}")
+                self.rule_sets[source_hash] = RuleSet(source_hash, validation_rules)
+                action = "Reloaded" if known is not None else "Loaded"
+                print(f"{action} {len(validation_rules)} rules from {rules_path} ({source_hash[:12]})")
+            self.files[rules_path] = (signature, source_hash)
+            rule_set = self.rule_sets[source_hash]
+            # Rule sets that no file uses any more are dropped; requests already using one keep it
+            in_use = {known_hash for _, known_hash in self.files.values()}
+            self.rule_sets = {known_hash: known for known_hash, known in self.rule_sets.items() if known_hash in in_use}
+            return rule_set
+
+    def stats(self):
+        """Returns the loaded rule files and the hash of the rules each one currently uses."""
+        with self.lock:
+            return {
+                "rule_sets": len(self.rule_sets),
+                "files": {path: source_hash for path, (_, source_hash) in self.files.items()},
+            }
+
+
+class ValidationHandler(BaseHTTPRequestHandler):
+    """
+    POST /validate?rules=<rules YAML>[&path=<data file>][&format=csv|parquet][&chunksize=N]
+        Validates the data file at path, or the CSV or Parquet request body, and streams
+        the validation report back as CSV, one chunk of rows at a time. The columns of
+        quarantined rules are listed in the X-Quarantined-Rules response header.
+    GET /health
+        Returns the loaded rule files as JSON.
+    """
+
+    protocol_version = "HTTP/1.1"
+    rule_sets = None  # RuleSetCache shared by every request, set by make_server
+
+    def do_GET(self):
+        if urlparse(self.path).path != "/health":
+            self.send_error(404, "Unknown endpoint")
+            return
+        body = json.dumps(self.rule_sets.stats()).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/validate":
+            self.send_error(404, "Unknown endpoint")
+            return
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        payload = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if "rules" not in query:
+            self.send_error(400, "Missing rules parameter")
+            return
+        try:
+            rule_set = self.rule_sets.get(query["rules"])
+            chunksize = int(query.get("chunksize", DEFAULT_CHUNKSIZE))
+            if "path" in query:
+                source, file_format = query["path"], None
+            elif payload:
+                content_type = self.headers.get("Content-Type", "")
+                source = payload
+                file_format = query.get("format") or ("parquet" if "parquet" in content_type else "csv")
+            else:
+                self.send_error(400, "Send a path parameter or a CSV or Parquet body")
+                return
+            columns = rule_columns(source, rule_set.validation_rules, file_format)
+            # Compile the rules and read the first chunk while an error can still be a 400
+            compiled_rules = rule_set.compiled_rules(columns)
+            frames = read_chunks(source, chunksize, columns, file_format, value_set_columns(compiled_rules))
+            first_frame = next(frames, None)
+        except (OSError, ValueError, yaml.YAMLError) as error:
+            self.send_error(400, str(error))
+            return
+        frames = itertools.chain([first_frame] if first_frame is not None else [], frames)
+
+        costs = rule_set.request_costs()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv")
+        self.send_header("Transfer-Encoding", "chunked")
+        quarantined_columns = sorted({column for key in costs.quarantined for column in costs.columns.get(key, ())})
+        if quarantined_columns:
+            self.send_header("X-Quarantined-Rules", ",".join(quarantined_columns))
+        self.end_headers()
+        self.write_chunk(REPORT_HEADER.encode("utf-8"))
+
+        try:
+            for errors_df in validate_frames(frames, compiled_rules, costs=costs):
+                if not errors_df.empty:
+                    self.write_chunk(errors_df.to_csv(header=False, index=False).encode("utf-8"))
+        finally:
+            rule_set.merge_costs(costs)
+        self.write_chunk(b"")
+
+    def write_chunk(self, data):
+        """Sends one chunk of a chunked response; an empty chunk ends the response."""
+        self.wfile.write(b"%x\r\n" % len(data) + data + b"\r\n")
+        self.wfile.flush()
+
+
+def make_server(host="127.0.0.1", port=8765, preload=()):
+    """Returns a threading HTTP server for the validation service, with the given rule files loaded."""
+    # Finish loading pandas now: a lazily imported module must not be first used by several threads at once
+    pd.DataFrame
+    rule_sets = RuleSetCache()
+    for rules_path in preload:
+        rule_sets.get(rules_path)
+    handler = type("Handler", (ValidationHandler,), {"rule_sets": rule_sets})
+    return ThreadingHTTPServer((host, port), handler)
+
+# ---------------- Main Execution ----------------
+def main():
+    parser = argparse.ArgumentParser(description="Serve data validation over HTTP with rule sets kept in memory")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on")
+    parser.add_argument("--preload", nargs="*", default=["validation_rules.yaml"],
+                        help="Validation rule files to load before the first request")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.preload)
+    print(f"Validation service listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
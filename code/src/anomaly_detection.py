@@ -1,139 +1,355 @@
-import pandas as pd
-import yaml
+import os
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import re
+from .value_sets import rule_value_set
+from .uniqueness import find_duplicates, present_values, HistoricalIndex
+from .anomaly_report import AnomalyReportWriter
+from .rule_bundle import load_rules_document
+from .data_io import read_columns, read_frame, read_chunks, split_frame
+from .lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+COUNTRY_CODE_PATTERN = re.compile(r'^[A-Z]{2}$')
+DIGITS_4_TO_6_PATTERN = re.compile(r'^\d{4,6}$')
+CUSIP_PATTERN = re.compile(r'^[A-Za-z0-9]{6}$')
+UNPRINTABLE_PATTERN = re.compile(r'[\x00-\x1F\x7F]')
+
+# Checks a rule plan can contain; each returns True when the value is valid.
+VALUE_CHECKS = {
+    'no_delimiters': lambda value: not (',' in value or '\r' in value or '\n' in value),
+    'country_code': lambda value: COUNTRY_CODE_PATTERN.match(value) is not None,
+    'digits_4_to_6': lambda value: DIGITS_4_TO_6_PATTERN.match(value) is not None,
+    'cusip': lambda value: CUSIP_PATTERN.match(value) is not None,
+    'printable': lambda value: UNPRINTABLE_PATTERN.search(value) is None,
+}
+
+# Allowable Values phrases in the order they are applied. A check of None accepts
+# the value outright, so no later phrase is considered.
+RULE_PHRASES = [
+    ('must not contain a carriage return, line feed, comma or any unprintable character', 'no_delimiters'),
+    ('use the 2 letter country code', 'country_code'),
+    ('free text', None),  # Accept any text value
+    ('report 4 to 6 digit number', 'digits_4_to_6'),
+    ('must be valid 6 digit CUSIP number', 'cusip'),
+    ('must be unique within a submission and over time', None),  # Checked across rows by check_uniqueness
+    ('must not contain', 'printable'),  # General rule to avoid unprintable characters
+    ('naics', 'digits_4_to_6'),
+    ('sic', 'digits_4_to_6'),
+    ('gics', 'digits_4_to_6'),
+]
+
+# Allowable Values phrase (lowercase) marking a column whose values must not repeat
+UNIQUE_PHRASE = 'must be unique within a submission and over time'
+
+
+def compile_rule_plan(allowable_values, value_set=None):
+    """Turn Allowable Values text into the ordered tuple of checks it implies.
+
+    A rule with a value set (see value_sets.rule_value_set) is checked by membership
+    of that frozenset alone, instead of the phrase heuristics.
+    """
+    if value_set is not None:
+        return (value_set,)
+    allowable_values = allowable_values.strip().lower()
+    plan = []
+    for phrase, check in RULE_PHRASES:
+        if phrase in allowable_values:
+            if check is None:
+                break
+            if check not in plan:
+                plan.append(check)
+    return tuple(plan)
+
+
+def value_passes(value, plan):
+    """Return True if a value passes every check in a plan."""
+    return all(value in check if isinstance(check, frozenset) else VALUE_CHECKS[check](value) for check in plan)
+
+
+def bundle_extras(ruleset):
+    """Return the compiled rule plans and unique fields of a parsed ruleset, to be stored in its rule bundle."""
+    rules = ruleset.get('rules', [])
+    return {
+        'rule_plans': {rule['Technical Field Name']: compile_rule_plan(rule.get('Allowable Values', ''),
+                                                                       rule_value_set(rule)) for rule in rules},
+        'unique_fields': [rule['Technical Field Name'] for rule in rules
+                          if UNIQUE_PHRASE in ' '.join(rule.get('Allowable Values', '').lower().split())],
+    }
+
+
+def column_failures(column, plan):
+    """Return a boolean mask of the cells in a column that fail any check in the plan."""
+    codes, uniques = pd.factorize(column.astype(str).fillna('nan'))
+    checks = [check for check in plan if not isinstance(check, frozenset)]
+    failed = np.fromiter((not all(VALUE_CHECKS[check](value) for check in checks) for value in uniques),
+                         dtype=bool, count=len(uniques))
+    # Value sets are checked with one vectorised membership test
+    for value_set in plan:
+        if isinstance(value_set, frozenset):
+            failed |= ~pd.Index(uniques).isin(value_set)
+    return failed[codes]
+
+
+# Columns of the compact issue records passed to the report writer
+ISSUE_COLUMNS = ['Row', 'Rule', 'Value', 'Issue']
+
+
+def issue_frame(rows, rule_ids, values, issues):
+    """Return compact issue records as a DataFrame with the columns in ISSUE_COLUMNS."""
+    return pd.DataFrame({
+        'Row': np.asarray(rows, dtype=np.int64),
+        'Rule': np.asarray(rule_ids, dtype=np.int32),
+        'Value': np.asarray(values, dtype=object),
+        'Issue': np.asarray(issues, dtype=object),
+    }, columns=ISSUE_COLUMNS)
+
+
+def frame_anomalies(frame, row_offset, rule_ids, rule_plans):
+    """Return the issue records for one DataFrame, numbering rows after row_offset.
+
+    Records are ordered by row, then by the position of the column in the frame.
+    """
+    rows, rules, values = [], [], []
+    for column_name in frame.columns:
+        plan = rule_plans.get(column_name)
+        if not plan:
+            continue
+        # Apply each column's plan once per distinct value, skipping columns with nothing to check
+        positions = np.flatnonzero(column_failures(frame[column_name], plan))
+        if len(positions):
+            rows.append(row_offset + positions + 1)
+            rules.append(np.full(len(positions), rule_ids[column_name]))
+            values.append(frame[column_name].to_numpy(dtype=object)[positions])
+
+    if not rows:
+        return issue_frame([], [], [], [])
+    rows = np.concatenate(rows)
+    order = np.argsort(rows, kind='stable')
+    return issue_frame(rows[order], np.concatenate(rules)[order], np.concatenate(values)[order],
+                       np.full(len(rows), 'Validation failed', dtype=object))
+
+
+def merge_issues(issues, extra_issues):
+    """Merge extra issue records into a batch, placing each after the batch's own issues for the same row."""
+    if extra_issues.empty:
+        return issues
+    merged = pd.concat([issues, extra_issues], ignore_index=True) if not issues.empty else extra_issues
+    return merged.sort_values('Row', kind='stable', ignore_index=True)
+
+
+# Rules held by each worker process, sent once when the worker starts.
+_worker_rules = None
+
+
+def _init_worker(rule_ids, rule_plans):
+    global _worker_rules
+    _worker_rules = (rule_ids, rule_plans)
+
+
+def _frame_anomalies_task(task):
+    row_offset, frame = task
+    return frame_anomalies(frame, row_offset, *_worker_rules)
 
 
 class AnomalyDetector:
-    def __init__(self, filtered_data_path, ruleset_path, output_path):
+    def __init__(self, filtered_data_path, ruleset_path, output_path, chunksize=None,
+                 history_path=None, submission=None, bloom_capacity=None):
         self.filtered_data_path = filtered_data_path
         self.ruleset_path = ruleset_path
         self.output_path = output_path
+        self.chunksize = chunksize
+        self.history_path = history_path
+        self.submission = submission or os.path.basename(filtered_data_path)
+        self.bloom_capacity = bloom_capacity
+        self.unique_columns = []
         self.filtered_data = None
+        self.data_columns = []
+        self.text_columns = []
         self.rules_dict = None
-        self.anomaly_records = []
+        self.rule_ids = None
+        self.rule_plans = None
+        self.report_writer = None
         self.total_rows = 0
 
     def load_data(self):
-        """Load filtered data and ruleset from files."""
-        # Load the filtered data
-        self.filtered_data = pd.read_csv(self.filtered_data_path)
-        self.total_rows = len(self.filtered_data)
+        """Load filtered data and ruleset from files.
 
-        # Load the processed ruleset YAML file
-        with open(self.ruleset_path, 'r') as file:
-            ruleset = yaml.safe_load(file)
+        The data may be CSV, Parquet or Arrow IPC. When a chunksize is set the data is not loaded here; detect_anomalies
+        streams it from disk instead.
+        """
+        # Load the processed ruleset YAML file, or its compiled bundle with the rule plans when it is up to date
+        ruleset, extras = load_rules_document(self.ruleset_path)
+        extras = extras or bundle_extras(ruleset)
 
         # Convert the ruleset to a dictionary for easy lookup
         self.rules_dict = {rule['Technical Field Name']: rule for rule in ruleset['rules']}
 
+        # Issue records refer to rules by their position in the ruleset
+        self.rule_ids = {name: rule_id for rule_id, name in enumerate(self.rules_dict)}
+
+        # Each rule is compiled once into the checks it needs
+        self.rule_plans = extras['rule_plans']
+
+        # Only the columns named in the ruleset are read from the filtered data
+        self.data_columns = [column for column in read_columns(self.filtered_data_path)
+                             if column in self.rules_dict]
+        self.unique_columns = [column for column in self.data_columns if column in extras['unique_fields']]
+
+        # Value-set columns are read as written, so a listed value such as the country code NA is not taken as missing
+        self.text_columns = [column for column in self.data_columns
+                             if any(isinstance(check, frozenset) for check in self.rule_plans.get(column, ()))]
+
+        # Load the filtered data
+        if self.chunksize is None:
+            self.filtered_data = read_frame(self.filtered_data_path, self.data_columns, text_columns=self.text_columns)
+            self.total_rows = len(self.filtered_data)
+
     def is_value_valid(self, value, rule):
         """Validate values based on the Allowable Values rule."""
-        allowable_values = rule.get('Allowable Values', '').strip().lower()
+        plan = compile_rule_plan(rule.get('Allowable Values', ''), rule_value_set(rule))
+        return value_passes(value, plan)
 
-        # Apply rule conditions based on the description
-        if 'must not contain a carriage return, line feed, comma or any unprintable character' in allowable_values:
-            if isinstance(value, str) and (',' in value or '\r' in value or '\n' in value):
-                return False
+    def iter_data(self, parts=1):
+        """Return an iterator of (row offset, DataFrame) pairs covering the filtered data.
 
-        if 'use the 2 letter country code' in allowable_values:
-            if isinstance(value, str) and not re.match(r'^[A-Z]{2}$', value):
-                return False
+        Loaded data is split into the given number of row ranges. In chunked
+        mode CSV cells are read as text, so results do not depend on where chunk
+        boundaries fall.
+        """
+        if self.chunksize is None:
+            return split_frame(self.filtered_data, parts)
+        return read_chunks(self.filtered_data_path, self.chunksize, self.data_columns, text_columns=self.text_columns)
 
-        if 'free text' in allowable_values:
-            return True  # Accept any text value
+    def detect_anomalies(self, workers=1):
+        """Detect anomalies by validating filtered data against ruleset.
 
-        if 'report 4 to 6 digit number' in allowable_values:
-            if isinstance(value, str) and not re.match(r'^\d{4,6}$', value):
-                return False
+        Issue records are streamed to the report writer batch by batch, so memory does
+        not grow with the number of anomalies. With more than one worker, row ranges are
+        fanned out to a process pool and the results are merged back in row order.
+        """
+        self.total_rows = 0
+        rules = [{'Field': name, 'Description': rule['Description'], 'Allowable Values': rule['Allowable Values']}
+                 for name, rule in self.rules_dict.items()]
+        self.report_writer = AnomalyReportWriter(self.output_path, rules)
+
+        # Uniqueness needs every row, so it is checked first and merged into each batch by row range
+        unique_issues = self.check_uniqueness()
+        unique_rows = unique_issues['Row'].to_numpy()
+
+        def write(row_offset, row_count, issues):
+            start, end = np.searchsorted(unique_rows, [row_offset + 1, row_offset + row_count + 1])
+            self.report_writer.write(merge_issues(issues, unique_issues.iloc[start:end]))
 
-        if 'must be valid 6 digit CUSIP number' in allowable_values:
-            if isinstance(value, str) and not re.match(r'^[A-Za-z0-9]{6}$', value):
-                return False
+        if workers <= 1:
+            for row_offset, frame in self.iter_data():
+                self.data_columns = list(frame.columns)
+                self.total_rows += len(frame)
+                write(row_offset, len(frame), frame_anomalies(frame, row_offset, self.rule_ids, self.rule_plans))
+            return
 
-        if 'must be unique within a submission and over time' in allowable_values:
-            return True  # Assuming uniqueness check is handled separately
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(self.rule_ids, self.rule_plans)) as pool:
+            # Keep at most two frames per worker in flight so chunked input stays bounded
+            pending = deque()
+            for row_offset, frame in self.iter_data(parts=workers * 4):
+                self.data_columns = list(frame.columns)
+                self.total_rows += len(frame)
+                pending.append((row_offset, len(frame), pool.submit(_frame_anomalies_task, (row_offset, frame))))
+                if len(pending) >= 2 * workers:
+                    row_offset, row_count, future = pending.popleft()
+                    write(row_offset, row_count, future.result())
+            while pending:
+                row_offset, row_count, future = pending.popleft()
+                write(row_offset, row_count, future.result())
 
-        if 'must not contain' in allowable_values:
-            # General rule to avoid unprintable characters
-            if isinstance(value, str) and re.search(r'[\x00-\x1F\x7F]', value):
-                return False
+    def iter_column(self, column_name):
+        """Yield (row offset, Series) pairs covering one column of the filtered data."""
+        if self.chunksize is None:
+            yield 0, self.filtered_data[column_name]
+            return
 
-        if 'naics' in allowable_values.lower() or 'sic' in allowable_values.lower() or 'gics' in allowable_values.lower():
-            if isinstance(value, str) and not re.match(r'^\d{4,6}$', value):
-                return False
+        text_columns = [column_name] if column_name in self.text_columns else []
+        for row_offset, chunk in read_chunks(self.filtered_data_path, self.chunksize, [column_name],
+                                             text_columns=text_columns):
+            yield row_offset, chunk[column_name]
 
-        # If no specific rules matched, consider it valid
-        return True
+    def check_uniqueness(self):
+        """Return issue records for values repeated within the submission, or already reported in an earlier one.
 
-    def detect_anomalies(self):
-        """Detect anomalies by validating filtered data against ruleset."""
-        self.anomaly_records.clear()  # Clear previous anomaly records
+        Each column whose rule says it must be unique is indexed in one pass (two with a
+        Bloom filter capacity). With a history path, values are also looked up in, and
+        then added to, the on-disk index of earlier submissions. Records are sorted by row.
+        """
+        rows, rule_ids, values, issues = [], [], [], []
 
-        for index, row in self.filtered_data.iterrows():
-            row_issues = []
+        def add_issue(row_index, column_name, value, issue):
+            rows.append(row_index)
+            rule_ids.append(self.rule_ids[column_name])
+            values.append(value)
+            issues.append(issue)
 
-            for column_name, value in row.items():
-                if column_name in self.rules_dict:
-                    rule = self.rules_dict[column_name]
-                    if not self.is_value_valid(str(value), rule):
-                        row_issues.append({
-                            "Field": column_name,
-                            "Value": value,
-                            "Issue": "Validation failed",
-                            "Description": rule['Description'],
-                            "Allowable Values": rule['Allowable Values']
-                        })
+        for column_name in self.unique_columns:
+            duplicates = find_duplicates(lambda: self.iter_column(column_name), self.bloom_capacity)
+            for value, duplicate_rows in duplicates.items():
+                # One message per value, naming the first row and the group size, so records stay compact
+                issue = f"Duplicate value (first in row {duplicate_rows[0]}, {len(duplicate_rows)} rows in total)"
+                for row in duplicate_rows:
+                    add_issue(row, column_name, value, issue)
 
-            if row_issues:
-                self.anomaly_records.append({"Row Index": index + 1, "Issues": row_issues})
+            if self.history_path is None:
+                continue
+            with HistoricalIndex(self.history_path) as history:
+                for row_offset, column in self.iter_column(column_name):
+                    column_values, positions = present_values(column)
+                    seen = history.previously_seen(column_name, column_values, self.submission)
+                    for value, position in zip(column_values, positions.tolist()):
+                        if value in seen:
+                            add_issue(row_offset + position + 1, column_name, value,
+                                      f"Value already reported in submission {seen[value]}")
+                    history.record(column_name, column_values, self.submission)
+
+        return issue_frame(rows, rule_ids, values, issues).sort_values('Row', kind='stable', ignore_index=True)
 
     def generate_report(self):
-        """Generate validation report and save to a text file."""
-        rows_with_anomalies = len(self.anomaly_records)
-        total_anomalies = sum(len(row["Issues"]) for row in self.anomaly_records)
+        """Finish the anomaly report: the text summary and details, or the rules table of a structured report."""
         checked_columns = list(self.rules_dict.keys())
-        processed_columns = set(self.filtered_data.columns)
+        processed_columns = set(self.data_columns)
         missing_columns = [col for col in checked_columns if col not in processed_columns]
-
-        with open(self.output_path, 'w') as report_file:
-            # Write summary report
-            report_file.write("Validation Report\n")
-            report_file.write("=" * 40 + "\n")
-            report_file.write(f"Total rows processed: {self.total_rows}\n")
-            report_file.write(f"Rows with anomalies: {rows_with_anomalies}\n")
-            report_file.write(f"Total anomalies found: {total_anomalies}\n\n")
-            report_file.write("Columns checked: " + ", ".join(checked_columns) + "\n")
-            report_file.write(
-                "\nNote: Missing required columns that weren't checked: " + ", ".join(missing_columns) + "\n\n")
-            report_file.write("Detailed Anomalies:\n\n")
-
-            # Write detailed anomalies row-wise
-            for anomaly in self.anomaly_records:
-                report_file.write(f"Row {anomaly['Row Index']}:\n")
-                for issue in anomaly['Issues']:
-                    report_file.write(f"  Field: {issue['Field']}\n")
-                    report_file.write(f"  Value: '{issue['Value']}'\n")
-                    report_file.write(f"  Issue: {issue['Issue']}\n")
-                    report_file.write(f"  Description: {issue['Description']}\n")
-                    report_file.write(f"  Allowable Values: {issue['Allowable Values']}\n\n")
+        self.report_writer.close(self.total_rows, checked_columns, missing_columns)
 
         print(f"Anomaly report successfully saved to: {self.output_path}")
 
 
 def main():
-    # Define file paths
-    filtered_data_path = 'Filtered_Data.csv'
-    ruleset_path = 'processed_ruleset.yaml'
-    output_path = 'anomaly_detected.txt'
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--input_csv", default='Filtered_Data.csv', help="Path to the filtered data CSV, Parquet or Arrow IPC file")
+    parser.add_argument("--ruleset", default='processed_ruleset.yaml', help="Path to the processed ruleset YAML file")
+    parser.add_argument("--output", default='anomaly_detected.txt', help="Path to the anomaly report; .jsonl, .csv or .parquet write compact records, anything else text")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="Stream the input in chunks of this many rows instead of loading it whole")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes to validate with")
+    parser.add_argument("--history", default=None,
+                        help="SQLite index of IDs from earlier submissions, checked and then updated")
+    parser.add_argument("--submission", default=None,
+                        help="Name of this submission in the history index (default: the input file name)")
+    parser.add_argument("--bloom_capacity", type=int, default=None,
+                        help="Expected number of IDs; bounds uniqueness memory with a Bloom filter prefilter")
+    args = parser.parse_args()
 
     # Create an AnomalyDetector instance
-    detector = AnomalyDetector(filtered_data_path, ruleset_path, output_path)
+    detector = AnomalyDetector(args.input_csv, args.ruleset, args.output, chunksize=args.chunksize,
+                               history_path=args.history, submission=args.submission,
+                               bloom_capacity=args.bloom_capacity)
 
     # Load data
     detector.load_data()
 
     # Detect anomalies
-    detector.detect_anomalies()
+    detector.detect_anomalies(workers=args.workers)
 
     # Generate report and save it to file
     detector.generate_report()
@@ -0,0 +1,141 @@
+import os
+import json
+import shutil
+import tempfile
+from .lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+
+
+def report_format(output_path):
+    """Return 'jsonl', 'csv', 'parquet' or 'text' depending on the report file's extension."""
+    extension = os.path.splitext(output_path)[1].lower()
+    if extension in ('.jsonl', '.json'):
+        return 'jsonl'
+    if extension in ('.parquet', '.pq'):
+        return 'parquet'
+    if extension == '.csv':
+        return 'csv'
+    return 'text'
+
+
+def rules_table_path(output_path):
+    """Return the path of the side table that describes the rules a report refers to."""
+    return output_path + '.rules.json'
+
+
+class AnomalyReportWriter:
+    """Stream compact anomaly records to a JSONL, CSV, Parquet or text report.
+
+    Each record is (Row, Rule, Value, Issue), where Rule is an index into the rules
+    table. For the structured formats the rule text and the summary counters are
+    written once to a JSON side table (see rules_table_path). The text format is the
+    original human-readable report: its details are spooled to a temporary file and
+    written after the summary when the writer is closed.
+    """
+
+    def __init__(self, output_path, rules):
+        self.output_path = output_path
+        self.format = report_format(output_path)
+        self.rules = rules
+        self.total_anomalies = 0
+        self.rows_with_anomalies = 0
+        self.rule_counts = [0] * len(rules)
+        self._parquet_writer = None
+        self._spool = tempfile.TemporaryFile('w+') if self.format == 'text' else None
+        if self.format in ('jsonl', 'csv'):
+            open(output_path, 'w').close()
+
+    def write(self, issues):
+        """Append a batch of issue records covering whole rows, in row order."""
+        if issues.empty:
+            return
+        self.total_anomalies += len(issues)
+        self.rows_with_anomalies += issues['Row'].nunique()
+        for rule_id, count in issues['Rule'].value_counts().items():
+            self.rule_counts[rule_id] += int(count)
+
+        if self.format == 'text':
+            self._write_text(issues)
+            return
+
+        # Values keep their types in memory; structured reports store them as text
+        values = issues['Value']
+        issues = issues.assign(Value=values.astype(str).where(values.notna(), None))
+        if self.format == 'jsonl':
+            with open(self.output_path, 'a') as report_file:
+                issues.to_json(report_file, orient='records', lines=True)
+        elif self.format == 'csv':
+            issues.to_csv(self.output_path, mode='a', header=self.total_anomalies == len(issues), index=False)
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            schema = pa.schema([('Row', pa.int64()), ('Rule', pa.int32()),
+                                ('Value', pa.string()), ('Issue', pa.string())])
+            table = pa.Table.from_pandas(issues, schema=schema, preserve_index=False)
+            self._parquet_writer = self._parquet_writer or pq.ParquetWriter(self.output_path, schema)
+            self._parquet_writer.write_table(table)
+
+    def _write_text(self, issues):
+        previous_row = None
+        for row, rule_id, value, issue in zip(issues['Row'], issues['Rule'], issues['Value'], issues['Issue']):
+            if row != previous_row:
+                self._spool.write(f"Row {row}:\n")
+                previous_row = row
+            rule = self.rules[rule_id]
+            # Missing cells are NaN when read from CSV and NA when read from Parquet or Arrow
+            if value is pd.NA:
+                value = float('nan')
+            self._spool.write(f"  Field: {rule['Field']}\n")
+            self._spool.write(f"  Value: '{value}'\n")
+            self._spool.write(f"  Issue: {issue}\n")
+            self._spool.write(f"  Description: {rule['Description']}\n")
+            self._spool.write(f"  Allowable Values: {rule['Allowable Values']}\n\n")
+
+    def summary(self, total_rows):
+        """Return the summary counters of the issues written so far."""
+        return {
+            "Total rows processed": total_rows,
+            "Rows with anomalies": self.rows_with_anomalies,
+            "Total anomalies found": self.total_anomalies,
+            "Anomalies per field": {rule['Field']: count for rule, count in zip(self.rules, self.rule_counts) if count},
+        }
+
+    def close(self, total_rows, checked_columns, missing_columns):
+        """Finish the report, writing the summary and, for structured formats, the rules table."""
+        if self.format == 'text':
+            with open(self.output_path, 'w') as report_file:
+                # Write summary report
+                report_file.write("Validation Report\n")
+                report_file.write("=" * 40 + "\n")
+                report_file.write(f"Total rows processed: {total_rows}\n")
+                report_file.write(f"Rows with anomalies: {self.rows_with_anomalies}\n")
+                report_file.write(f"Total anomalies found: {self.total_anomalies}\n\n")
+                report_file.write("Columns checked: " + ", ".join(checked_columns) + "\n")
+                report_file.write(
+                    "\nNote: Missing required columns that weren't checked: " + ", ".join(missing_columns) + "\n\n")
+                report_file.write("Detailed Anomalies:\n\n")
+
+                # Write detailed anomalies row-wise
+                self._spool.seek(0)
+                shutil.copyfileobj(self._spool, report_file)
+            self._spool.close()
+            return
+
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+        elif self.format == 'parquet':
+            # No issues were found; still write an empty report with the expected columns
+            pd.DataFrame({'Row': pd.Series(dtype='int64'), 'Rule': pd.Series(dtype='int32'),
+                          'Value': pd.Series(dtype=object), 'Issue': pd.Series(dtype=object)}).to_parquet(
+                self.output_path, index=False)
+        elif self.format == 'csv' and not self.total_anomalies:
+            with open(self.output_path, 'w') as report_file:
+                report_file.write("Row,Rule,Value,Issue\n")
+
+        with open(rules_table_path(self.output_path), 'w') as rules_file:
+            json.dump({
+                "summary": dict(self.summary(total_rows), **{"Columns checked": checked_columns,
+                                                             "Missing columns": missing_columns}),
+                "rules": [dict(rule, Rule=rule_id) for rule_id, rule in enumerate(self.rules)],
+            }, rules_file, indent=2, ensure_ascii=False)
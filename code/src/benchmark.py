@@ -0,0 +1,363 @@
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+import multiprocessing
+from importlib.metadata import distribution
+from .lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, where peak RSS is not measured
+    resource = None
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Columns of a Schedule H.1 corporate loan extract, as in Filtered_Data.csv
+LOAN_COLUMNS = [
+    "CustomerID", "InternalObligorID", "OriginalInternalObligorID", "ObligorName", "City", "Country",
+    "ZipCodeForeignMailingCode", "IndustryCode", "IndustryCodeType", "InternalRating", "TIN",
+    "StockExchange", "TickerSymbol", "CUSIP", "InternalCreditFacilityID",
+]
+OBLIGOR_NAMES = ["Vega PLC", "Woodward Grant", "Individual", "Harbor Holdings", "Summit Partners", "Atlas Group"]
+CITIES = ["Houston", "New York", "London", "Toronto", "Chicago", "Frankfurt"]
+COUNTRIES = ["US", "GB", "CA", "DE", "FR", "JP"]
+INDUSTRY_CODE_TYPES = ["NAICS", "SIC", "GICS"]
+RATINGS = ["AA", "BB", "CC", "DD"]
+EXCHANGES = ["NYSE", "NASDAQ", "LSE", "TSX", "NA"]
+LETTERS = list("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+
+# Values written over a random cell of an anomalous row
+ANOMALOUS_VALUES = ["", "X,Y", "bad\x01value", "12", "usa", "TOOLONGVALUE1234567890", "N/A", "??"]
+
+# Installed distribution whose console scripts are timed by bench_startup
+DISTRIBUTION_NAME = "gaidp-deep-profi"
+
+PDF_HEADERS = ["Field No.", "Field Name;(Technical Field Name)", "Description", "Allowable Values"]
+PDF_COLUMN_X = [36, 86, 246, 436, 576]
+PDF_ROW_HEIGHT = 24
+
+
+def random_codes(rng, length, size):
+    """Return size random upper-case codes of the given length."""
+    return pd.Series(np.array(LETTERS)[rng.integers(0, len(LETTERS), (size, length))].tolist()).str.join("")
+
+
+def generate_loans_block(rng, start, size, anomaly_rate):
+    """Return one block of synthetic loan rows, numbered from start."""
+    ids = np.arange(start, start + size)
+    block = pd.DataFrame({
+        "CustomerID": pd.Series(ids).map("C{:09d}".format),
+        "InternalObligorID": pd.Series(ids // 2).map("OBL{:09d}".format),
+        "ObligorName": rng.choice(OBLIGOR_NAMES, size),
+        "City": rng.choice(CITIES, size),
+        "Country": rng.choice(COUNTRIES, size),
+        "ZipCodeForeignMailingCode": rng.integers(10000, 99999, size).astype(str),
+        "IndustryCode": rng.integers(1000, 999999, size).astype(str),
+        "IndustryCodeType": rng.choice(INDUSTRY_CODE_TYPES, size),
+        "InternalRating": rng.choice(RATINGS, size),
+        "TIN": (pd.Series(rng.integers(10, 99, size)).map("{:02d}".format) + "-"
+                + pd.Series(rng.integers(0, 9_999_999, size)).map("{:07d}".format)),
+        "StockExchange": rng.choice(EXCHANGES, size),
+        "TickerSymbol": random_codes(rng, 4, size),
+        "CUSIP": random_codes(rng, 6, size),
+        "InternalCreditFacilityID": pd.Series(ids).map("F{:011d}".format),
+    })
+    block["OriginalInternalObligorID"] = block["InternalObligorID"]
+    block = block[LOAN_COLUMNS]
+
+    # Corrupt one random cell in each anomalous row
+    anomalous_rows = np.flatnonzero(rng.random(size) < anomaly_rate)
+    anomalous_columns = rng.integers(0, len(LOAN_COLUMNS), len(anomalous_rows))
+    anomalous_values = rng.choice(ANOMALOUS_VALUES, len(anomalous_rows))
+    for row, column, value in zip(anomalous_rows, anomalous_columns, anomalous_values):
+        block.iat[row, column] = value
+    return block
+
+
+def generate_loans_csv(csv_path, rows, anomaly_rate=0.05, seed=0, block_size=100_000):
+    """Write a seeded synthetic Schedule H loan CSV with the given number of rows."""
+    rng = np.random.default_rng(seed)
+    for start in range(0, rows, block_size):
+        block = generate_loans_block(rng, start, min(block_size, rows - start), anomaly_rate)
+        block.to_csv(csv_path, mode="a" if start else "w", header=not start, index=False)
+
+
+def pdf_escape(text):
+    """Escape text for a PDF string literal."""
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def pdf_table_page(table_rows):
+    """Return the content stream of a page holding one ruled table."""
+    top = 756
+    bottom = top - PDF_ROW_HEIGHT * len(table_rows)
+    commands = ["0.5 w"]
+    for i in range(len(table_rows) + 1):
+        y = top - i * PDF_ROW_HEIGHT
+        commands.append(f"{PDF_COLUMN_X[0]} {y} m {PDF_COLUMN_X[-1]} {y} l S")
+    for x in PDF_COLUMN_X:
+        commands.append(f"{x} {top} m {x} {bottom} l S")
+    for i, row in enumerate(table_rows):
+        for j, cell in enumerate(row):
+            for k, line in enumerate(cell.split("\n")[:2]):
+                y = top - i * PDF_ROW_HEIGHT - 9 - k * 9
+                commands.append(f"BT /F1 7 Tf {PDF_COLUMN_X[j] + 2} {y} Td ({pdf_escape(line)}) Tj ET")
+    return "\n".join(commands).encode("latin-1")
+
+
+def generate_rules_pdf(pdf_path, pages, rows_per_page=28, seed=0):
+    """
+    Write a seeded synthetic rule PDF shaped like the FR Y-14Q instructions: a ruled
+    table of fields whose Description and Allowable Values continue onto extra rows
+    with an empty Field No., sometimes across page boundaries.
+    """
+    rng = np.random.default_rng(seed)
+    table_rows = []
+    field_no = 0
+    while len(table_rows) < pages * (rows_per_page - 1):
+        field_no += 1
+        name = f"Field{field_no}"
+        allowable = rng.choice([
+            "Must not contain a carriage return, line feed, comma\nor any unprintable character.",
+            "Use the 2 letter Country Code", "Report 4 to 6 digit number", "Free text",
+        ])
+        table_rows.append([str(field_no), f"Field {field_no}\n({name})",
+                           f"Report the {name} value for the obligor\nas defined in the glossary.", allowable])
+        for _ in range(rng.integers(0, 4)):
+            table_rows.append(["", "", "Continuation of the description for\nthe same field.", "See above."])
+
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page in range(pages):
+        # Like the real instructions, every page repeats the header row
+        rows = [PDF_HEADERS] + table_rows[page * (rows_per_page - 1):(page + 1) * (rows_per_page - 1)]
+        content = pdf_table_page(rows)
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (len(objects)))
+        page_ids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % page_id for page_id in page_ids), len(page_ids))
+
+    with open(pdf_path, "wb") as pdf:
+        pdf.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(pdf.tell())
+            pdf.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+        xref_offset = pdf.tell()
+        pdf.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for offset in offsets:
+            pdf.write(b"%010d 00000 n \n" % offset)
+        pdf.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset))
+
+
+def peak_rss_mb():
+    """Return the peak resident set size of this process in MB, or None where it cannot be measured."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def bench_validate_data(csv_path, validation_yaml, workers, chunksize):
+    from .LLM.validateDataYaml import load_yaml, validate_data, validate_data_chunks
+    rules = load_yaml(validation_yaml)
+    start_time = time.perf_counter()
+    if chunksize:
+        anomalies = sum(len(errors_df) for errors_df in validate_data_chunks(csv_path, rules, chunksize, workers))
+    else:
+        anomalies = len(validate_data(csv_path, rules, workers))
+    return {"validate_data": time.perf_counter() - start_time}, {"anomalies": anomalies}
+
+
+def bench_detect_anomalies(csv_path, ruleset_yaml, workers, chunksize):
+    from .anomaly_detection import AnomalyDetector
+    detector = AnomalyDetector(csv_path, ruleset_yaml, os.devnull, chunksize=chunksize)
+    start_time = time.perf_counter()
+    detector.load_data()
+    detector.detect_anomalies(workers=workers)
+    return {"detect_anomalies": time.perf_counter() - start_time}, {"rows_with_anomalies": detector.report_writer.rows_with_anomalies}
+
+
+def bench_extract_pdf(pdf_path, workers):
+    from .LLM.PdfToCsv_New import extract_table_from_pdf, merge_continuation_rows
+    start_time = time.perf_counter()
+    # Extraction is lazy, so the rows are collected first to time the two stages apart
+    rows = list(extract_table_from_pdf(pdf_path, workers))
+    extracted_time = time.perf_counter()
+    merged = list(merge_continuation_rows(rows))
+    return ({"extract_table_from_pdf": extracted_time - start_time,
+             "merge_continuation_rows": time.perf_counter() - extracted_time},
+            {"table_rows": len(rows), "rules": len(merged)})
+
+
+def startup_commands():
+    """
+    Return the module of every console script the package installs ([project.scripts]
+    in pyproject.toml), relative to this package, so a new command is timed too.
+    """
+    modules = {entry_point.value.split(":")[0] for entry_point in distribution(DISTRIBUTION_NAME).entry_points
+               if entry_point.group == "console_scripts"}
+    return sorted(module[len(__package__) + 1:] for module in modules)
+
+
+def bench_startup(repeat=3):
+    """
+    Return the best wall time in seconds of `python -m <module> --help` for each startup
+    command, which is the cost of importing the module and everything it imports eagerly.
+    """
+    timings = {}
+    for command in startup_commands():
+        module = f"{__package__}.{command}"
+        best = None
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            subprocess.run([sys.executable, "-m", module, "--help"], stdout=subprocess.DEVNULL, check=True)
+            elapsed = time.perf_counter() - start_time
+            best = elapsed if best is None else min(best, elapsed)
+        timings[command] = best
+    return timings
+
+
+def _isolated_target(queue, function, args):
+    queue.put((*function(*args), peak_rss_mb()))
+
+
+def run_isolated(function, *args):
+    """
+    Run a benchmark function in a fresh process so its peak RSS is measured on its own.
+    Returns the function's (timings, counters) and the peak RSS in MB.
+    """
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_isolated_target, args=(queue, function, args))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def run_benchmarks(args):
+    """Generate (or reuse) the synthetic inputs, run every stage and return the results."""
+    os.makedirs(args.data_dir, exist_ok=True)
+    csv_path = os.path.join(args.data_dir, f"loans_{args.rows}_{args.anomaly_rate}_{args.seed}.csv")
+    pdf_path = os.path.join(args.data_dir, f"rules_{args.pages}_{args.seed}.pdf")
+    if not os.path.exists(csv_path):
+        print(f"Generating {args.rows} loan rows at {csv_path}")
+        generate_loans_csv(csv_path, args.rows, args.anomaly_rate, args.seed)
+    if not os.path.exists(pdf_path):
+        print(f"Generating {args.pages} page rule PDF at {pdf_path}")
+        generate_rules_pdf(pdf_path, args.pages, seed=args.seed)
+
+    stages = {}
+    runs = [
+        (bench_validate_data, (csv_path, args.validation_yaml, args.workers, args.chunksize), args.rows),
+        (bench_detect_anomalies, (csv_path, args.ruleset_yaml, args.workers, args.chunksize), args.rows),
+        (bench_extract_pdf, (pdf_path, args.workers), None),
+    ]
+    for function, function_args, rows in runs:
+        timings, counters, peak_rss = run_isolated(function, *function_args)
+        for stage, seconds in timings.items():
+            items = rows if rows is not None else counters.get("table_rows", 0)
+            stages[stage] = {
+                "seconds": round(seconds, 4),
+                "rows_per_sec": round(items / seconds, 1) if seconds else None,
+                "peak_rss_mb": round(peak_rss, 1) if peak_rss is not None else None,
+                **counters,
+            }
+            rss_text = f"{peak_rss:9.1f} MB" if peak_rss is not None else f"{'n/a':>9}   "
+            print(f"{stage:<25} {seconds:9.3f}s {stages[stage]['rows_per_sec'] or 0:14,.0f} rows/s "
+                  f"{rss_text} peak RSS")
+
+    startup = {}
+    for command, seconds in bench_startup().items():
+        startup[command] = round(seconds, 4)
+        print(f"{'startup ' + command:<32} {seconds:9.3f}s")
+
+    return {
+        "config": {"rows": args.rows, "pages": args.pages, "anomaly_rate": args.anomaly_rate, "seed": args.seed,
+                   "workers": args.workers, "chunksize": args.chunksize},
+        "stages": stages,
+        "startup": startup,
+    }
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    """Return the stages whose throughput fell more than tolerance below the baseline."""
+    regressions = []
+    for stage, baseline_stage in baseline["stages"].items():
+        current = results["stages"].get(stage)
+        if current is None or not baseline_stage.get("rows_per_sec") or not current.get("rows_per_sec"):
+            continue
+        if current["rows_per_sec"] < baseline_stage["rows_per_sec"] * (1 - tolerance):
+            regressions.append((stage, baseline_stage["rows_per_sec"], current["rows_per_sec"]))
+    return regressions
+
+
+def startup_over_budget(results, budget):
+    """Return the commands whose startup took longer than budget seconds."""
+    return [(command, seconds) for command, seconds in results.get("startup", {}).items() if seconds > budget]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the validation pipeline on synthetic Schedule H data")
+    parser.add_argument("--rows", type=int, default=10_000, help="Number of synthetic loan rows (10k to 50M)")
+    parser.add_argument("--pages", type=int, default=100, help="Number of pages in the synthetic rule PDF")
+    parser.add_argument("--anomaly_rate", type=float, default=0.05, help="Fraction of rows with an anomalous cell")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic data generators")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes passed to each stage")
+    parser.add_argument("--chunksize", type=int, default=None, help="Stream the loan CSV in chunks of this many rows")
+    parser.add_argument("--data_dir", default="bench_data", help="Directory for the generated inputs")
+    parser.add_argument("--validation_yaml", default=os.path.join(SRC_DIR, "validation_rules.yaml"),
+                        help="Validation rules used by validate_data")
+    parser.add_argument("--ruleset_yaml", default=os.path.join(SRC_DIR, "processed_ruleset.yaml"),
+                        help="Ruleset used by AnomalyDetector")
+    parser.add_argument("--results", default="benchmark_results.json", help="Path to write the results JSON")
+    parser.add_argument("--baseline", default=None,
+                        help="Baseline results JSON to compare against; record one with --save_baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed fractional throughput drop")
+    parser.add_argument("--save_baseline", action="store_true", help="Write the results to --baseline as well")
+    parser.add_argument("--startup_budget", type=float, default=0.5,
+                        help="Seconds a command may take to start (python -m <module> --help)")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args)
+    with open(args.results, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Benchmark results saved to {args.results}")
+
+    slow_starts = startup_over_budget(results, args.startup_budget)
+    for command, seconds in slow_starts:
+        print(f"REGRESSION: {command} took {seconds:.3f}s to start, budget {args.startup_budget:.3f}s")
+    if slow_starts:
+        sys.exit(1)
+
+    if args.baseline and args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    elif args.baseline and not os.path.exists(args.baseline):
+        print(f"Warning: no baseline at {args.baseline}; record one with --baseline {args.baseline} --save_baseline")
+    elif args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline["config"] != results["config"]:
+            print("Warning: baseline was recorded with a different configuration")
+        regressions = compare_with_baseline(results, baseline, args.tolerance)
+        for stage, baseline_rate, current_rate in regressions:
+            print(f"REGRESSION: {stage} ran at {current_rate:,.0f} rows/s, baseline {baseline_rate:,.0f} rows/s")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
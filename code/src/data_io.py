@@ -0,0 +1,115 @@
+import io
+import os
+from contextlib import nullcontext
+from .lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+
+# Cells pandas reads as missing by default
+NA_VALUES = ("", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+             "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null")
+
+
+def data_format(path):
+    """Return 'parquet', 'arrow' or 'csv' depending on a data or report file's extension."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.parquet', '.pq'):
+        return 'parquet'
+    if extension in ('.arrow', '.feather', '.ipc'):
+        return 'arrow'
+    return 'csv'
+
+
+def _open(source):
+    # Payloads held in memory are read through a fresh buffer each time, file paths as they are
+    return io.BytesIO(source) if isinstance(source, bytes) else source
+
+
+def _arrow_file(source):
+    # Files on disk are memory-mapped; payloads are read from their buffer
+    import pyarrow as pa
+    return pa.memory_map(source) if isinstance(source, str) else nullcontext(_open(source))
+
+
+def read_columns(source, file_format=None):
+    """Return the column names of a CSV, Parquet or Arrow IPC file without reading its rows.
+
+    source is a file path, or the file's contents as bytes together with its file_format.
+    """
+    file_format = file_format or data_format(source)
+    if file_format == 'parquet':
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(_open(source)).schema_arrow.names
+    if file_format == 'arrow':
+        import pyarrow as pa
+        with _arrow_file(source) as arrow_file:
+            return pa.ipc.open_file(arrow_file).schema.names
+    return list(pd.read_csv(_open(source), nrows=0).columns)
+
+
+def csv_options(columns, text_columns=()):
+    """Return the read_csv options that read the given columns as text.
+
+    Cells of text_columns are only missing when empty, so a value such as "NA"
+    (Namibia, or "not applicable" in a code list) is kept as written.
+    """
+    options = {'dtype': str, 'usecols': columns}
+    if text_columns:
+        options['keep_default_na'] = False
+        options['na_values'] = {column: [''] if column in text_columns else list(NA_VALUES) for column in columns}
+    return options
+
+
+def read_frame(source, columns, file_format=None, text_columns=()):
+    """Read only the given columns of a CSV, Parquet or Arrow IPC file into a DataFrame.
+
+    CSV cells are read as text, since the rules check the text as written; see
+    csv_options for text_columns. Parquet and Arrow columns keep their stored types as
+    Arrow-backed columns, so an integer column with nulls stays integer instead of
+    turning into floats.
+    """
+    file_format = file_format or data_format(source)
+    if file_format == 'parquet':
+        return pd.read_parquet(_open(source), columns=columns, dtype_backend='pyarrow')
+    if file_format == 'arrow':
+        return pd.read_feather(_open(source), columns=columns, dtype_backend='pyarrow')
+    return pd.read_csv(_open(source), **csv_options(columns, text_columns))
+
+
+def _arrow_chunks(source, chunksize, columns):
+    import pyarrow as pa
+    with _arrow_file(source) as arrow_file:
+        reader = pa.ipc.open_file(arrow_file)
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i).select(columns)
+            for offset in range(0, batch.num_rows, chunksize):
+                yield batch.slice(offset, chunksize).to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def read_chunks(source, chunksize, columns, file_format=None, text_columns=()):
+    """Yield (row offset, DataFrame) pairs of at most chunksize rows of the given columns of a file.
+
+    Columns are typed as in read_frame, so a chunk with nulls has the same types as one
+    without and results do not depend on where chunk boundaries fall.
+    """
+    file_format = file_format or data_format(source)
+    if file_format == 'parquet':
+        import pyarrow.parquet as pq
+        chunks = (batch.to_pandas(types_mapper=pd.ArrowDtype) for batch in
+                  pq.ParquetFile(_open(source)).iter_batches(batch_size=chunksize, columns=columns))
+    elif file_format == 'arrow':
+        chunks = _arrow_chunks(source, chunksize, columns)
+    else:
+        chunks = pd.read_csv(_open(source), chunksize=chunksize, **csv_options(columns, text_columns))
+
+    row_offset = 0
+    for chunk in chunks:
+        yield row_offset, chunk
+        row_offset += len(chunk)
+
+
+def split_frame(df, parts):
+    """Yield (row offset, DataFrame) pairs splitting a DataFrame into the given number of row ranges."""
+    step = max(1, -(-len(df) // parts))
+    for start in range(0, len(df), step):
+        yield start, df.iloc[start:start + step]
@@ -1,30 +1,43 @@
-import pandas as pd
+import argparse
 import yaml
+from .value_sets import extract_value_set
+from .lazy_imports import lazy_import
 
-# Load the CSV file
-file_path = 'processed_ruleset.csv'
-df = pd.read_csv(file_path)
-
-# Prepare a list of dictionaries for YAML generation following the required format
-rules_list = []
-for _, row in df.iterrows():
-    rule = {
-        'Field No.': str(row['Field_Number']),
-        'Field Name': row['Technical_Name'],
-        'Technical Field Name': row['Technical_Name'],
-        'Description': row['Description'],
-        'Allowable Values': row['Allowable Values']
-    }
-    rules_list.append(rule)
-
-# Define the structure of the YAML document
-yaml_data = {'rules': rules_list}
-
-# Specify the path for the YAML output file
-yaml_output_path = 'processed_ruleset.yaml'
-
-# Write the YAML file
-with open(yaml_output_path, 'w') as yaml_file:
-    yaml.dump(yaml_data, yaml_file, default_flow_style=False)
-
-print(f"YAML file has been generated and saved at {yaml_output_path}")
+pd = lazy_import("pandas")
+
+def main():
+    """Convert a processed ruleset CSV into the processed ruleset YAML."""
+    parser = argparse.ArgumentParser(description="Convert the processed ruleset CSV into the ruleset YAML")
+    parser.add_argument("--input", default="processed_ruleset.csv", help="Path to the processed ruleset CSV file")
+    parser.add_argument("--output", default="processed_ruleset.yaml", help="Path to write the ruleset YAML file")
+    args = parser.parse_args()
+
+    # Load the CSV file
+    df = pd.read_csv(args.input)
+
+    # Prepare a list of dictionaries for YAML generation following the required format
+    rules_list = []
+    for _, row in df.iterrows():
+        rule = {
+            'Field No.': str(row['Field_Number']),
+            'Field Name': row['Technical_Name'],
+            'Technical Field Name': row['Technical_Name'],
+            'Description': row['Description'],
+            'Allowable Values': row['Allowable Values']
+        }
+        # Closed code lists become explicit value sets, checked by set membership
+        rule.update(extract_value_set(row['Allowable Values']))
+        rules_list.append(rule)
+
+    # Define the structure of the YAML document
+    yaml_data = {'rules': rules_list}
+
+    # Write the YAML file
+    with open(args.output, 'w') as yaml_file:
+        yaml.dump(yaml_data, yaml_file, default_flow_style=False)
+
+    print(f"YAML file has been generated and saved at {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+import sys
+import importlib.util
+
+# Function to import a module on first use
+def lazy_import(name):
+    """
+    Returns a module that is only executed when one of its attributes is first used.
+    Heavy libraries such as pandas, pdfplumber and ollama are imported this way, so
+    that a command only loads what its code path needs and --help starts quickly.
+    A module that is already imported is returned as it is.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -0,0 +1,125 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+# Profiler collecting spans in this process, or None while profiling is off
+_profiler = None
+
+
+class Profiler:
+    """
+    Timing spans recorded as Chrome trace "complete" events, which chrome://tracing
+    and Perfetto can load. Each span has a category (stage, page, llm, rule), a name
+    and optional numeric counters such as cells checked or failures, which the
+    summary adds up per span name.
+    """
+
+    def __init__(self):
+        self.events = []
+
+    def add(self, name, category, start, seconds, lane=None, args=None):
+        """Records a span that started at start (time.perf_counter seconds) and lasted seconds."""
+        self.events.append({
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": round(start * 1e6, 3),
+            "dur": round(seconds * 1e6, 3),
+            "pid": os.getpid(),
+            "tid": threading.get_ident() if lane is None else lane,
+            "args": args or {},
+        })
+
+    def merge(self, events):
+        """Adds spans recorded by another process, such as a worker."""
+        self.events.extend(events)
+
+    def save_trace(self, trace_path):
+        """Writes the spans as a Chrome trace JSON file."""
+        with open(trace_path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+        print(f"Trace saved to {trace_path}")
+
+    def summary(self):
+        """
+        Returns a dictionary of {category: {name: totals}}, where totals has the
+        span count, total and longest seconds, and the sum of each numeric counter.
+        """
+        categories = {}
+        for event in self.events:
+            totals = categories.setdefault(event["cat"], {}).setdefault(
+                event["name"], {"count": 0, "seconds": 0.0, "max_seconds": 0.0})
+            seconds = event["dur"] / 1e6
+            totals["count"] += 1
+            totals["seconds"] += seconds
+            totals["max_seconds"] = max(totals["max_seconds"], seconds)
+            for key, value in event["args"].items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    totals[key] = totals.get(key, 0) + value
+        return categories
+
+    def print_summary(self, top=10):
+        """Prints the most expensive spans of each category and their share of the category's time."""
+        for category, names in self.summary().items():
+            category_seconds = sum(totals["seconds"] for totals in names.values())
+            print(f"\nProfile ({category}, {len(names)} distinct, {category_seconds:.3f}s):")
+            for name, totals in sorted(names.items(), key=lambda item: item[1]["seconds"], reverse=True)[:top]:
+                share = totals["seconds"] / category_seconds * 100 if category_seconds else 0.0
+                counters = "".join(f"  {key}={value}" for key, value in totals.items()
+                                   if key not in ("count", "seconds", "max_seconds"))
+                print(f"  {totals['seconds']:8.3f}s {share:5.1f}% {totals['count']:>6}x "
+                      f"max {totals['max_seconds']:.3f}s  {name}{counters}")
+
+
+def enable():
+    """Starts collecting spans in this process and returns the Profiler."""
+    global _profiler
+    _profiler = Profiler()
+    return _profiler
+
+
+def disable():
+    """Stops collecting spans and returns the Profiler that collected them, if any."""
+    global _profiler
+    profiler, _profiler = _profiler, None
+    return profiler
+
+
+def active():
+    """Returns the Profiler collecting spans in this process, or None."""
+    return _profiler
+
+
+def drain():
+    """Returns and forgets the spans collected so far, so a worker can send them to its parent."""
+    if _profiler is None:
+        return []
+    events, _profiler.events = _profiler.events, []
+    return events
+
+
+def merge(events):
+    """Adds spans sent by a worker process to this process's Profiler, if profiling is on."""
+    if _profiler is not None and events:
+        _profiler.merge(events)
+
+
+@contextmanager
+def span(name, category="stage", lane=None, **args):
+    """
+    Times the block as a span when profiling is on, and does nothing otherwise.
+    Yields a dictionary of counters that the block can fill in, e.g. failures.
+    Spans that overlap on one thread, such as concurrent LLM calls, can be given
+    their own lane in the trace.
+    """
+    profiler = _profiler
+    if profiler is None:
+        yield args
+        return
+    start = time.perf_counter()
+    try:
+        yield args
+    finally:
+        profiler.add(name, category, start, time.perf_counter() - start, lane, args)
@@ -0,0 +1,145 @@
+import os
+import sys
+import pickle
+import hashlib
+import argparse
+import importlib
+import importlib.util
+import yaml
+
+# Version of the bundle layout; bundles written with another version are ignored
+BUNDLE_VERSION = 1
+
+# Module and function that build the precomputed extras for each kind of rule file,
+# keyed by the file's top-level key. They are imported only when a bundle is compiled,
+# and a kind whose module cannot be imported (e.g. a missing dependency) gets a bundle
+# without extras. Module names are relative to this package.
+EXTRAS_BUILDERS = {
+    "validation_rules": (".LLM.pattern_registry", "bundle_extras"),
+    "rules": (".anomaly_detection", "bundle_extras"),
+}
+
+# Modules whose code decides what the extras contain: the builders and the modules
+# they take plans, phrases and value sets from. A change to any of them makes
+# existing bundles stale.
+EXTRAS_SOURCES = [".LLM.pattern_registry", ".LLM.fast_patterns", ".anomaly_detection", ".value_sets"]
+
+def bundle_path(yaml_path):
+    """Returns the path of the compiled bundle of a rule YAML file."""
+    return os.path.splitext(yaml_path)[0] + ".bundle"
+
+def source_hash(yaml_path):
+    """Returns the SHA-256 of a rule YAML file's contents."""
+    with open(yaml_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def code_hash():
+    """
+    Returns the SHA-256 of the source of the EXTRAS_SOURCES modules, read without
+    importing them, so a bundle can tell whether its extras were built by this code.
+    """
+    digest = hashlib.sha256()
+    for module_name in EXTRAS_SOURCES:
+        spec = importlib.util.find_spec(module_name, __package__)
+        with open(spec.origin, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def intern_strings(value):
+    """
+    Returns the parsed YAML with every string interned, so repeated text such as a
+    shared Anomaly Message is one object and is stored once in the bundle.
+    """
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, dict):
+        return {intern_strings(key): intern_strings(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [intern_strings(item) for item in value]
+    return value
+
+def build_extras(document):
+    """Returns the precomputed extras for a parsed rule file, or None if it has none."""
+    for key, (module_name, function_name) in EXTRAS_BUILDERS.items():
+        if isinstance(document, dict) and key in document:
+            try:
+                module = importlib.import_module(module_name, __package__)
+            except ImportError:
+                return None
+            return getattr(module, function_name)(document)
+    return None
+
+# Function to compile a rule YAML file into a bundle
+def compile_bundle(yaml_path, output_path=None):
+    """
+    Parses a rule YAML file once and pickles it, with the hash of the YAML it came
+    from and any precomputed extras, into a bundle next to it.
+    Returns the path of the bundle.
+    """
+    output_path = output_path or bundle_path(yaml_path)
+    with open(yaml_path, "rb") as f:
+        text = f.read()
+    document = intern_strings(yaml.safe_load(text))
+    bundle = {
+        "version": BUNDLE_VERSION,
+        "source_hash": hashlib.sha256(text).hexdigest(),
+        "code_hash": code_hash(),
+        "document": document,
+        "extras": build_extras(document),
+    }
+    with open(output_path, "wb") as f:
+        pickle.dump(bundle, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return output_path
+
+def load_bundle(yaml_path):
+    """
+    Returns the bundle of a rule YAML file as a dictionary with its "document" and
+    "extras", or None if there is no bundle, it has another version, or it was built
+    from a different YAML file or by different extras code (it is stale). Only load
+    bundles you compiled yourself: they are pickles.
+    """
+    path = bundle_path(yaml_path)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            bundle = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    if not isinstance(bundle, dict) or bundle.get("version") != BUNDLE_VERSION:
+        return None
+    if bundle.get("code_hash") != code_hash():
+        print(f"Warning: ignoring {path}, compiled by older rule code; run compile-rules again")
+        return None
+    if not os.path.exists(yaml_path):
+        print(f"Warning: {yaml_path} is missing; using {path} without checking it is up to date")
+    elif bundle["source_hash"] != source_hash(yaml_path):
+        return None
+    return bundle
+
+# Function to load a rule file from its bundle, or from the YAML
+def load_rules_document(yaml_path):
+    """
+    Returns (parsed rule file, extras). The compiled bundle is used when it is up to
+    date; otherwise the YAML is parsed and extras is None.
+    """
+    bundle = load_bundle(yaml_path)
+    if bundle is not None:
+        return bundle["document"], bundle["extras"]
+    with open(yaml_path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f), None
+
+# ---------------- Main Execution ----------------
+def main():
+    parser = argparse.ArgumentParser(description="Compile rule YAML files into binary bundles that load quickly")
+    parser.add_argument("yaml_files", nargs="+", help="Rule YAML files, e.g. validation_rules.yaml")
+    args = parser.parse_args()
+
+    for yaml_file in args.yaml_files:
+        output_path = compile_bundle(yaml_file)
+        extras = load_bundle(yaml_file)["extras"]
+        print(f"Compiled {yaml_file} to {output_path} ({os.path.getsize(output_path)} bytes"
+              f"{', with precomputed checks' if extras is not None else ''})")
+
+if __name__ == "__main__":
+    main()
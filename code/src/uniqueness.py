@@ -0,0 +1,128 @@
+import math
+import sqlite3
+from .lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+def value_hashes(values, hash_key='0123456789123456'):
+    """Return a 64-bit hash of each value, computed in one vectorised pass."""
+    return pd.util.hash_array(np.asarray(values, dtype=object), hash_key=hash_key)
+
+
+def present_values(column):
+    """Return the non-missing, non-blank cells of a column as stripped strings, and their positions."""
+    values = column.astype(str).str.strip()
+    present = (column.notna() & (values != '')).to_numpy()
+    return values[present], np.flatnonzero(present)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over 64-bit value hashes.
+
+    Sized for capacity values at the given false positive rate, so its memory does
+    not grow with the number of distinct IDs.
+    """
+
+    def __init__(self, capacity, error_rate=0.01):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+
+    def _positions(self, hashes):
+        # Double hashing: position i is h1 + i * h2, taken from the two halves of the 64-bit hash
+        h1 = (hashes >> np.uint64(32)).astype(np.uint64)
+        h2 = (hashes & np.uint64(0xFFFFFFFF)) | np.uint64(1)
+        return [(h1 + np.uint64(i) * h2) % np.uint64(self.size) for i in range(self.hash_count)]
+
+    def add(self, hashes):
+        """Add hashes and return a mask of those that may have been added before."""
+        seen = np.ones(len(hashes), dtype=bool)
+        for positions in self._positions(hashes):
+            byte, bit = positions // np.uint64(8), (positions % np.uint64(8)).astype(np.uint8)
+            seen &= (self.bits[byte] >> bit) & 1 == 1
+            np.bitwise_or.at(self.bits, byte, np.left_shift(np.uint8(1), bit))
+        return seen
+
+
+def find_duplicates(iter_chunks, bloom_capacity=None):
+    """Find every row that shares a value with another row.
+
+    iter_chunks is called with no arguments and yields (row offset, Series) pairs;
+    rows are numbered from 1 after the offset. Without bloom_capacity a hash index of
+    every value is built in a single pass. With it, a first pass runs the values
+    through a Bloom filter sized for that many values and keeps only the hashes it
+    may have seen before; a second pass indexes just those candidates, so memory
+    is bounded by the filter and the number of repeated values.
+    Returns a dictionary of each duplicated value and the rows it appears on.
+    """
+    candidates = None
+    if bloom_capacity is not None:
+        bloom = BloomFilter(bloom_capacity)
+        repeated = []
+        for _, column in iter_chunks():
+            hashes = value_hashes(present_values(column)[0])
+            # The filter is read before the chunk is added, so repeats within the chunk are found separately
+            maybe_seen = bloom.add(hashes) | pd.Series(hashes).duplicated().to_numpy()
+            repeated.append(hashes[maybe_seen])
+        candidates = np.unique(np.concatenate(repeated)) if repeated else np.array([], dtype=np.uint64)
+
+    first_rows = {}
+    duplicates = {}
+    for row_offset, column in iter_chunks():
+        values, positions = present_values(column)
+        rows = row_offset + positions + 1
+        if candidates is not None:
+            keep = np.isin(value_hashes(values), candidates)
+            values, rows = values[keep], rows[keep]
+        for value, row in zip(values, rows.tolist()):
+            first_row = first_rows.setdefault(value, row)
+            if first_row != row:
+                duplicates.setdefault(value, [first_row]).append(row)
+    return duplicates
+
+
+class HistoricalIndex:
+    """On-disk SQLite index of the IDs reported in earlier submissions, per column."""
+
+    def __init__(self, index_path='id_history.sqlite'):
+        self.index_path = index_path
+        self.connection = sqlite3.connect(index_path)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS id_history (
+                column_name TEXT NOT NULL,
+                value TEXT NOT NULL,
+                submission TEXT NOT NULL,
+                PRIMARY KEY (column_name, value)
+            )
+        """)
+        self.connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def previously_seen(self, column_name, values, submission):
+        """Return a dictionary of the values already reported in another submission, and that submission."""
+        self.connection.execute("CREATE TEMP TABLE IF NOT EXISTS lookup (value TEXT PRIMARY KEY)")
+        self.connection.execute("DELETE FROM lookup")
+        self.connection.executemany("INSERT OR IGNORE INTO lookup VALUES (?)", ((value,) for value in values))
+        rows = self.connection.execute("""
+            SELECT h.value, h.submission FROM id_history h JOIN lookup l ON h.value = l.value
+            WHERE h.column_name = ? AND h.submission != ?
+        """, (column_name, submission)).fetchall()
+        return dict(rows)
+
+    def record(self, column_name, values, submission):
+        """Add values to the index; values already present keep their first submission."""
+        self.connection.executemany(
+            "INSERT OR IGNORE INTO id_history (column_name, value, submission) VALUES (?, ?, ?)",
+            ((column_name, value, submission) for value in values))
+        self.connection.commit()
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
@@ -0,0 +1,75 @@
+import re
+
+# ISO 3166-1 alpha-2 country codes, loaded once per process and shared by every rule that refers to them
+ISO_COUNTRY_CODES = frozenset("""
+    AD AE AF AG AI AL AM AO AQ AR AS AT AU AW AX AZ
+    BA BB BD BE BF BG BH BI BJ BL BM BN BO BQ BR BS BT BV BW BY BZ
+    CA CC CD CF CG CH CI CK CL CM CN CO CR CU CV CW CX CY CZ
+    DE DJ DK DM DO DZ
+    EC EE EG EH ER ES ET
+    FI FJ FK FM FO FR
+    GA GB GD GE GF GG GH GI GL GM GN GP GQ GR GS GT GU GW GY
+    HK HM HN HR HT HU
+    ID IE IL IM IN IO IQ IR IS IT
+    JE JM JO JP
+    KE KG KH KI KM KN KP KR KW KY KZ
+    LA LB LC LI LK LR LS LT LU LV LY
+    MA MC MD ME MF MG MH MK ML MM MN MO MP MQ MR MS MT MU MV MW MX MY MZ
+    NA NC NE NF NG NI NL NO NP NR NU NZ
+    OM
+    PA PE PF PG PH PK PL PM PN PR PS PT PW PY
+    QA
+    RE RO RS RU RW
+    SA SB SC SD SE SG SH SI SJ SK SL SM SN SO SR SS ST SV SX SY SZ
+    TC TD TF TG TH TJ TK TL TM TN TO TR TT TV TW TZ
+    UA UG UM US UY UZ
+    VA VC VE VG VI VN VU
+    WF WS
+    YE YT
+    ZA ZM ZW
+""".split())
+
+# Reference lists a rule can name in its "Value Set Reference"
+REFERENCE_LISTS = {
+    "ISO 3166-1 alpha-2": ISO_COUNTRY_CODES,
+}
+
+# Allowable Values phrases (lowercase) that mean the value comes from a reference list
+REFERENCE_PHRASES = [
+    ("2 letter country code", "ISO 3166-1 alpha-2"),
+]
+
+# Longest item accepted in a numbered list of codes, to skip numbered prose
+MAX_CODE_LENGTH = 40
+
+# Function to extract a closed list of values from Allowable Values text
+def extract_value_set(allowable_values):
+    """
+    Recognises Allowable Values text that lists every valid value.
+    Returns {"Value Set": [...], "Value Set Codes": [...]} for a numbered list such as
+    "1. NAICS 2. SIC 3. GICS", whose labels and numbers are both valid submissions,
+    {"Value Set Reference": name} for text naming a reference list such as
+    "Use the 2 letter Country Code", or {} for anything else.
+    """
+    text = " ".join(str(allowable_values or "").split())
+
+    for phrase, reference in REFERENCE_PHRASES:
+        if phrase in text.lower():
+            return {"Value Set Reference": reference}
+
+    # "1. NAICS 2. SIC 3. GICS" splits into ["", "1", "NAICS", "2", "SIC", "3", "GICS"]
+    parts = re.split(r"(?:^|\s)(\d+)\.\s+", text)
+    numbers, items = parts[1::2], [item.strip().rstrip(".") for item in parts[2::2]]
+    if (parts[0] or len(items) < 2 or numbers != [str(n) for n in range(1, len(items) + 1)]
+            or not all(0 < len(item) <= MAX_CODE_LENGTH for item in items)):
+        return {}
+    return {"Value Set": items, "Value Set Codes": numbers}
+
+def rule_value_set(rule):
+    """
+    Returns the frozenset of values a rule allows, or None if the rule has no value set.
+    A numbered list allows each item's code as well as its label.
+    """
+    if rule.get("Value Set"):
+        return frozenset(str(value) for value in rule["Value Set"] + (rule.get("Value Set Codes") or []))
+    return REFERENCE_LISTS.get(rule.get("Value Set Reference"))
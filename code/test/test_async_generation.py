@@ -0,0 +1,81 @@
+import asyncio
+import pytest
+from gaidp_deep_profi.LLM.fake_ollama import FakeAsyncClient
+from gaidp_deep_profi.LLM.regExpollama import (generate_validation_regex_async, generate_validation_regexes,
+                                               generate_validation_rules)
+
+
+def generate_one(client, timeout=1.0, retries=3):
+    async def run():
+        return await generate_validation_regex_async(client, asyncio.Semaphore(1), "Country of the obligor",
+                                                     "Use the 2 letter Country Code", timeout=timeout,
+                                                     retries=retries, backoff=0)
+    return asyncio.run(run())
+
+
+class TrackingClient(FakeAsyncClient):
+    """FakeAsyncClient that records the most calls in flight at once and answers later calls sooner."""
+
+    def __init__(self, count):
+        super().__init__()
+        self.count = count
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def chat(self, model="", messages=None, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        self.latency = 0.01 * (self.count - self.calls)
+        try:
+            return await super().chat(model, messages, **kwargs)
+        finally:
+            self.in_flight -= 1
+
+
+def test_failed_calls_are_retried():
+    client = FakeAsyncClient(latency=0.01, fail_first=2)
+    assert generate_one(client) == "^[A-Z]{2}$"
+    assert client.calls == 3
+
+
+def test_error_is_raised_once_retries_run_out():
+    client = FakeAsyncClient(latency=0.01, fail_first=3)
+    with pytest.raises(ConnectionError):
+        generate_one(client, retries=2)
+    assert client.calls == 3
+
+
+def test_slow_calls_time_out_and_are_retried():
+    client = FakeAsyncClient(latency=0.5)
+    with pytest.raises(asyncio.TimeoutError):
+        generate_one(client, timeout=0.02, retries=1)
+    assert client.calls == 2
+
+
+def test_concurrent_failures_each_take_one_of_fail_first():
+    # Concurrent calls all start before any finishes; exactly fail_first of them fail
+    client = FakeAsyncClient(latency=0.02, fail_first=2)
+    rules = [{"Allowable Values": "Report 4 to 6 digit number"}] * 4
+
+    async def run():
+        return await asyncio.gather(*(generate_validation_regexes([rule], client, concurrency=4, retries=0)
+                                      for rule in rules), return_exceptions=True)
+    results = asyncio.run(run())
+    assert sum(isinstance(result, ConnectionError) for result in results) == 2
+    assert client.calls == 4
+
+
+def test_results_keep_rule_order_with_bounded_concurrency():
+    allowable_values = ["Use the 2 letter Country Code", "Report 4 to 6 digit number",
+                        "Must not contain a comma", "Free text"] * 3
+    rules = [{"Technical Field Name": f"Field{i}", "Field No.": str(i), "Description": "",
+              "Allowable Values": text} for i, text in enumerate(allowable_values)]
+    client = TrackingClient(len(rules))
+
+    validation_rules, generated = generate_validation_rules(rules, concurrency=3, client=client)
+    assert generated == len(rules)
+    assert client.max_in_flight == 3
+    expected = {"Use the 2 letter Country Code": "^[A-Z]{2}$", "Report 4 to 6 digit number": "^\\d+$",
+                "Must not contain a comma": "^[^\\r\\n,\\p{Cc}]+$", "Free text": ".*"}
+    assert [rule["Regex"] for rule in validation_rules] == [expected[text] for text in allowable_values]
+    assert [rule["Technical Field Name"] for rule in validation_rules] == [rule["Technical Field Name"] for rule in rules]
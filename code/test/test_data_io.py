@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+from gaidp_deep_profi.data_io import read_chunks, read_columns, read_frame, split_frame
+
+FRAME = pd.DataFrame({
+    "Zip": pd.array([12345, None, 1234], dtype="Int64"),
+    "Name": ["a", "b", None],
+    "Other": [1.5, 2.5, 3.5],
+})
+
+
+@pytest.fixture(params=["csv", "parquet", "arrow"])
+def data_file(request, tmp_path):
+    path = str(tmp_path / f"data.{request.param}")
+    if request.param != "csv":
+        pytest.importorskip("pyarrow")
+    if request.param == "csv":
+        with open(path, "w") as f:
+            f.write("Zip,Name,Other\n01234,a,1.50\n,b,2.5\n1234,,3.5\n")
+    elif request.param == "parquet":
+        FRAME.to_parquet(path, index=False)
+    else:
+        FRAME.to_feather(path)
+    return request.param, path
+
+
+def cell_text(df):
+    """The cells of a DataFrame as the text the rules check, with missing cells as None."""
+    return [[None if pd.isna(value) else str(value) for value in row] for row in df.itertuples(index=False)]
+
+
+def test_whole_and_chunked_reads_agree(data_file):
+    file_format, path = data_file
+    assert read_columns(path) == ["Zip", "Name", "Other"]
+    whole = read_frame(path, ["Zip", "Name"])
+    chunks = list(read_chunks(path, 2, ["Zip", "Name"]))
+    assert [row_offset for row_offset, _ in chunks] == [0, 2]
+    assert cell_text(pd.concat([chunk for _, chunk in chunks], ignore_index=True)) == cell_text(whole)
+
+    # CSV cells keep their text; stored integers with nulls stay integers
+    expected_zip = "01234" if file_format == "csv" else "12345"
+    assert cell_text(whole) == [[expected_zip, "a"], [None, "b"], ["1234", None]]
+
+
+def test_payload_reads_like_the_file(data_file):
+    file_format, path = data_file
+    with open(path, "rb") as f:
+        payload = f.read()
+    assert read_columns(payload, file_format) == read_columns(path)
+    assert cell_text(read_frame(payload, ["Zip"], file_format)) == cell_text(read_frame(path, ["Zip"]))
+    assert [cell_text(chunk) for _, chunk in read_chunks(payload, 2, ["Zip"], file_format)] == \
+        [cell_text(chunk) for _, chunk in read_chunks(path, 2, ["Zip"])]
+
+
+def test_split_frame_covers_every_row():
+    df = pd.DataFrame({"a": range(10)})
+    parts = list(split_frame(df, 4))
+    assert [row_offset for row_offset, _ in parts] == [0, 3, 6, 9]
+    assert pd.concat([part for _, part in parts]).equals(df)
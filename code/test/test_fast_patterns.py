@@ -0,0 +1,57 @@
+import random
+import string
+import pytest
+import regex
+from gaidp_deep_profi.LLM.fast_patterns import classify_pattern, plan_matches
+from gaidp_deep_profi.LLM.pattern_registry import canonical_pattern
+
+# One pattern per shape classify_pattern takes off the regex engine
+PATTERNS = [
+    # Runs of a named set, with every kind of quantifier
+    r"^[A-Za-z0-9]+$", r"[0-9]*", r"[A-Za-z]{3}", r"^[A-Z]{2,}$", r"[a-z]{1,4}", r"[A-Z]",
+    # \d, which the regex engine matches against any Unicode decimal digit
+    r"^\d{5}$", r"\d+", r"\d{4,6}", r"\d*",
+    # Other sets of literals, ranges and escaped punctuation, with - at either end
+    r"^[A-Z0-9.-]{1,10}$", r"[\-\.A-F]+", r"[-_a-c]{0,3}", r"[ -~]*", r"[x]{2}",
+    # Wrapped in a group
+    r"^([A-Z]{2})$", r"(?:\d{3})",
+    # Alternations of literals, including escaped punctuation and an empty alternative
+    r"^(NAICS|SIC|GICS)$", r"(?:US|GB|CA)", r"N\.A\.|n/a", r"abc", r"A|",
+]
+
+# Non-ASCII letters and digits, and whitespace, that a fast path must not let through by accident
+EXTRA_CHARACTERS = "٣３²éßİǅΩ\n\t "
+
+
+def sample_values(pattern, count=400, seed=0):
+    """Random strings over the characters of the pattern, ASCII and EXTRA_CHARACTERS, with near misses."""
+    rng = random.Random(seed)
+    own = [char for char in pattern if char.isprintable()]
+    pool = own * 4 + list(string.ascii_letters + string.digits + string.punctuation + EXTRA_CHARACTERS)
+    values = ["", "NAICS", "SIC", "GICS", "US", "N.A.", "n/a", "abc", "A", "12345", "12345\n", "１２３４５", "٣٣٣", "xx"]
+    for _ in range(count):
+        values.append("".join(rng.choice(pool) for _ in range(rng.randint(0, 12))))
+    # Longer and shorter versions of values that may match, to probe the length bounds and anchors
+    values += [value + value[-1:] for value in values[:count // 4]] + [value[1:] for value in values[:count // 4]]
+    return values
+
+
+@pytest.mark.parametrize("pattern", PATTERNS)
+def test_plan_matches_agrees_with_regex(pattern):
+    plan = classify_pattern(canonical_pattern(pattern))
+    assert plan is not None, f"{pattern} should take the fast path"
+    compiled = regex.compile(pattern)
+    values = sample_values(pattern)
+    expected = [compiled.fullmatch(value) is not None for value in values]
+    matched = plan_matches(values, plan).tolist()
+    mismatches = [(value, want) for value, want, got in zip(values, expected, matched) if want != got]
+    assert not mismatches
+    # The sample has to exercise both outcomes for the comparison to mean anything
+    assert any(expected) and not all(expected)
+
+
+@pytest.mark.parametrize("pattern", [
+    r"[^,]+", r"\w+", r"[A-Z]+\d", r"(a|b)+", r"[\d.]+", r"a.c", r"[é]+", r"(?i)abc", r"[z-a]",
+])
+def test_other_patterns_are_left_to_regex(pattern):
+    assert classify_pattern(canonical_pattern(pattern)) is None
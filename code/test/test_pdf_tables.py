@@ -0,0 +1,105 @@
+import copy
+import random
+import unicodedata
+import pytest
+from gaidp_deep_profi.LLM.PdfToCsv_New import clean_cells, clean_text, merge_continuation_rows
+
+
+def reference_clean_text(text):
+    """clean_text as it was before the translation table: replace, normalize and encode every cell."""
+    if text is None:
+        return ""
+    replacements = {"“": "\"", "”": "\"", "‘": "'", "’": "'",
+                    "–": "-", "—": "-", "…": "..."}
+    for old, new in replacements.items():
+        text = text.replace(old, new)
+    normalized = unicodedata.normalize("NFKD", text)
+    ascii_text = normalized.encode("ascii", "ignore").decode("ascii")
+    return " ".join(ascii_text.split()).strip()
+
+
+def reference_merge(rows):
+    """merge_continuation_rows as it was before it became a generator."""
+    merged_rows = []
+    prev_row = None
+    for i, row in enumerate(rows):
+        if row.get("Field No.", "").strip() == "":
+            if prev_row is not None:
+                desc = row.get("Description", "").strip()
+                allow_vals = row.get("Allowable Values", "").strip()
+                if desc:
+                    prev_desc = prev_row.get("Description", "").strip()
+                    prev_row["Description"] = (prev_desc + " " + desc).strip() if prev_desc else desc
+                if allow_vals:
+                    prev_allow = prev_row.get("Allowable Values", "").strip()
+                    prev_row["Allowable Values"] = (prev_allow + " " + allow_vals).strip() if prev_allow else allow_vals
+                    if i == len(rows) - 1:
+                        merged_rows.append(prev_row)
+            else:
+                if i == len(rows) - 1:
+                    merged_rows.append(row)
+                prev_row = row
+        else:
+            if prev_row is not None:
+                merged_rows.append(prev_row)
+            if i == len(rows) - 1:
+                merged_rows.append(row)
+            prev_row = row
+    return merged_rows
+
+
+# Curly quotes, dashes, accents, ligatures, fullwidth forms, CJK, emoji and assorted whitespace
+UNICODE_CHARACTERS = ("“”‘’–—…éÉñçøßæﬁﬂＡ１²½™©°µΩ中文😀"
+                      "\u00a0\u2003\u200b\u3000\t\n\r\x0c")
+
+
+def random_text(rng, length):
+    pool = UNICODE_CHARACTERS + "abcXYZ019 ;().,-\"'"
+    return "".join(rng.choice(pool) for _ in range(length))
+
+
+def test_clean_text_matches_the_reference():
+    rng = random.Random(0)
+    texts = [None, "", "   ", "Plain ASCII  text\n"] + [random_text(rng, rng.randint(0, 30)) for _ in range(3000)]
+    assert [clean_text(text) for text in texts] == [reference_clean_text(text) for text in texts]
+    assert clean_cells(texts) == [reference_clean_text(text) for text in texts]
+
+
+def row(field_no, description="", allowable_values=""):
+    return {"Field No.": field_no, "Field Name;(Technical Field Name)": f"Field {field_no}",
+            "Description": description, "Allowable Values": allowable_values}
+
+
+def test_trailing_continuation_row_is_merged_into_the_last_field():
+    rows = [row("1", "First"), row("2", "Second", "A"), row("", "continued")]
+    merged = list(merge_continuation_rows(rows))
+    assert [(field["Field No."], field["Description"], field["Allowable Values"]) for field in merged] == [
+        ("1", "First", ""), ("2", "Second continued", "A")]
+
+
+def test_leading_continuation_rows_are_kept_as_a_field_of_their_own():
+    rows = [row("", "Orphan"), row("", "text", "X"), row("1", "First", "A"), row("", "", "B")]
+    merged = list(merge_continuation_rows(rows))
+    assert [(field["Field No."], field["Description"], field["Allowable Values"]) for field in merged] == [
+        ("", "Orphan text", "X"), ("1", "First", "A B")]
+
+
+def test_merge_does_not_change_its_input():
+    rows = [row("1", "First"), row("", "continued", "X")]
+    before = copy.deepcopy(rows)
+    list(merge_continuation_rows(rows))
+    assert rows == before
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_merge_matches_the_reference(seed):
+    rng = random.Random(seed)
+    texts = ["", " ", "alpha", " beta ", "gamma delta"]
+    for _ in range(200):
+        rows = [row(rng.choice(["", "", " ", "1", "2"]), rng.choice(texts), rng.choice(texts))
+                for _ in range(rng.randint(1, 12))]
+        last = rows[-1]
+        # The reference dropped the last field when the table ended on a continuation row without Allowable Values
+        if len(rows) > 1 and not last["Field No."].strip() and not last["Allowable Values"].strip():
+            continue
+        assert list(merge_continuation_rows(copy.deepcopy(rows))) == reference_merge(copy.deepcopy(rows))
@@ -0,0 +1,36 @@
+import sqlite3
+from gaidp_deep_profi.LLM.regex_cache import RegexCache
+
+
+def last_used(cache_path):
+    with sqlite3.connect(cache_path) as connection:
+        return dict(connection.execute("SELECT key, last_used_at FROM regex_cache").fetchall())
+
+
+def test_hits_are_written_when_the_cache_closes(tmp_path):
+    cache_path = str(tmp_path / "cache.sqlite")
+    with RegexCache(cache_path) as cache:
+        cache.put("a", "model", "^a$")
+        cache.put("b", "model", "^b$")
+    before = last_used(cache_path)
+
+    with RegexCache(cache_path) as cache:
+        assert cache.get("a") == "^a$"
+        assert cache.get("missing") is None
+        # Hits are held in memory until evict or close
+        assert last_used(cache_path) == before
+    after = last_used(cache_path)
+    assert after["a"] > before["a"]
+    assert after["b"] == before["b"]
+
+
+def test_eviction_keeps_entries_hit_in_the_same_session(tmp_path):
+    cache_path = str(tmp_path / "cache.sqlite")
+    with RegexCache(cache_path) as cache:
+        cache.put("old", "model", "^old$")
+        cache.put("new", "model", "^new$")
+    with RegexCache(cache_path, max_entries=1) as cache:
+        assert cache.get("old") == "^old$"
+    with RegexCache(cache_path) as cache:
+        assert cache.stats() == {"model": 1}
+        assert cache.get("old") == "^old$"
@@ -0,0 +1,49 @@
+import os
+import yaml
+from gaidp_deep_profi import rule_bundle
+from gaidp_deep_profi.rule_bundle import compile_bundle, load_bundle, load_rules_document
+
+RULESET = {"rules": [
+    {"Technical Field Name": "Country", "Description": "Country of domicile",
+     "Allowable Values": "Use the 2 letter Country Code", "Value Set Reference": "ISO 3166-1 alpha-2"},
+]}
+
+
+def write_ruleset(tmp_path):
+    path = tmp_path / "ruleset.yaml"
+    path.write_text(yaml.safe_dump(RULESET))
+    return str(path)
+
+
+def test_fresh_bundle_is_used(tmp_path):
+    yaml_path = write_ruleset(tmp_path)
+    compile_bundle(yaml_path)
+    document, extras = load_rules_document(yaml_path)
+    assert document == RULESET
+    assert "US" in extras["rule_plans"]["Country"][0]
+
+
+def test_bundle_from_other_yaml_is_stale(tmp_path):
+    yaml_path = write_ruleset(tmp_path)
+    compile_bundle(yaml_path)
+    with open(yaml_path, "a") as f:
+        f.write("# edited\n")
+    assert load_bundle(yaml_path) is None
+
+
+def test_bundle_from_other_code_is_stale(tmp_path, monkeypatch, capsys):
+    yaml_path = write_ruleset(tmp_path)
+    compile_bundle(yaml_path)
+    monkeypatch.setattr(rule_bundle, "code_hash", lambda: "changed")
+    assert load_bundle(yaml_path) is None
+    assert "compiled by older rule code" in capsys.readouterr().out
+    # The YAML is parsed instead and its extras are worked out again
+    assert load_rules_document(yaml_path) == (RULESET, None)
+
+
+def test_bundle_without_yaml_is_used_with_a_warning(tmp_path, capsys):
+    yaml_path = write_ruleset(tmp_path)
+    compile_bundle(yaml_path)
+    os.remove(yaml_path)
+    assert load_bundle(yaml_path)["document"] == RULESET
+    assert "is missing" in capsys.readouterr().out
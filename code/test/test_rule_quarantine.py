@@ -0,0 +1,38 @@
+import pytest
+from gaidp_deep_profi.LLM.validateDataYaml import RuleCosts, validate_csv_mmap, validate_data
+
+# An LLM-generated ticker regex with an unbalanced parenthesis
+INVALID_REGEX = r"^(NA|[A-Z]{1,5}([.-])?[A-Z]{2,4})($|[\s][A-Za-z0-9._%]+))"
+
+RULES = [
+    {"Technical Field Name": "Zip", "Is Mandatory": "Mandatory", "Regex": r"^\d{5}$",
+     "Anomaly Message": "Invalid data in 'Zip'."},
+    {"Technical Field Name": "TKR", "Is Mandatory": "Mandatory", "Regex": INVALID_REGEX,
+     "Anomaly Message": "Invalid data in 'TKR'."},
+]
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("Zip,TKR\n1234,AAPL\n12345,\n12345,lower case\n")
+    return str(path)
+
+
+@pytest.mark.parametrize("on_timeout", ["skip", "fallback"])
+@pytest.mark.parametrize("validate", [validate_data, validate_csv_mmap])
+def test_invalid_regex_is_quarantined(csv_path, validate, on_timeout):
+    costs = RuleCosts(on_timeout=on_timeout)
+    errors_df = validate(csv_path, RULES, costs=costs)
+    assert list(costs.quarantined) == [INVALID_REGEX]
+    assert costs.quarantined[INVALID_REGEX].startswith("invalid regex")
+    # The mandatory check of the quarantined rule still runs
+    assert list(zip(errors_df["Row"], errors_df["Column"])) == [(1, "Zip"), (2, "TKR")]
+
+
+def test_mmap_records_costs_in_cells(csv_path):
+    pandas_costs = RuleCosts()
+    mmap_costs = RuleCosts()
+    validate_data(csv_path, RULES, costs=pandas_costs)
+    validate_csv_mmap(csv_path, RULES, costs=mmap_costs)
+    assert mmap_costs.cells == pandas_costs.cells == {r"\d{5}": 3}
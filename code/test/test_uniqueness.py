@@ -0,0 +1,80 @@
+import json
+import os
+import pandas as pd
+import pytest
+import yaml
+from gaidp_deep_profi.anomaly_detection import AnomalyDetector
+from gaidp_deep_profi.uniqueness import HistoricalIndex, find_duplicates
+
+RULESET = {"rules": [
+    {"Technical Field Name": "ID", "Description": "Unique loan identifier",
+     "Allowable Values": "Must be unique within a submission and over time."},
+]}
+
+
+@pytest.fixture
+def ruleset_path(tmp_path):
+    path = tmp_path / "ruleset.yaml"
+    path.write_text(yaml.safe_dump(RULESET))
+    return str(path)
+
+
+def write_ids(tmp_path, ids, name="data.csv"):
+    path = tmp_path / name
+    path.write_text("ID\n" + "".join(f"{value}\n" for value in ids))
+    return str(path)
+
+
+def detect(data_path, ruleset_path, output_path, **kwargs):
+    detector = AnomalyDetector(data_path, ruleset_path, output_path, **kwargs)
+    detector.load_data()
+    detector.detect_anomalies()
+    detector.generate_report()
+    with open(output_path) as report_file:
+        return [json.loads(line) for line in report_file]
+
+
+@pytest.mark.parametrize("options", [{}, {"bloom_capacity": 1000}, {"chunksize": 700, "bloom_capacity": 1000}])
+def test_repeated_id_report_grows_linearly(tmp_path, ruleset_path, options):
+    rows = 5000
+    data_path = write_ids(tmp_path, ["A"] * rows + ["B", "C", "B"])
+    output_path = str(tmp_path / "report.jsonl")
+    records = detect(data_path, ruleset_path, output_path, **options)
+
+    assert [record["Row"] for record in records] == list(range(1, rows + 1)) + [rows + 1, rows + 3]
+    assert {record["Issue"] for record in records[:rows]} == {f"Duplicate value (first in row 1, {rows} rows in total)"}
+    assert records[-1]["Issue"] == f"Duplicate value (first in row {rows + 1}, 2 rows in total)"
+    # Each record has a bounded size however large its group is
+    assert os.path.getsize(output_path) < 100 * len(records)
+
+
+def test_bloom_prefilter_finds_the_same_duplicates():
+    ids = [f"ID{i % 700}" if i % 3 else f"U{i}" for i in range(3000)] + ["", None, ""]
+
+    def iter_chunks():
+        column = pd.Series(ids, dtype=object)
+        for start in range(0, len(column), 400):
+            yield start, column.iloc[start:start + 400]
+
+    expected = find_duplicates(iter_chunks)
+    assert expected
+    assert find_duplicates(iter_chunks, bloom_capacity=100) == expected
+    assert find_duplicates(iter_chunks, bloom_capacity=100000) == expected
+
+
+def test_history_flags_ids_from_earlier_submissions(tmp_path, ruleset_path):
+    history_path = str(tmp_path / "history.sqlite")
+    first = write_ids(tmp_path, ["A", "B", "C"], "first.csv")
+    second = write_ids(tmp_path, ["D", "B", "E", "A"], "second.csv")
+
+    assert detect(first, ruleset_path, str(tmp_path / "first.jsonl"), history_path=history_path) == []
+    records = detect(second, ruleset_path, str(tmp_path / "second.jsonl"), history_path=history_path)
+    assert [(record["Row"], record["Value"], record["Issue"]) for record in records] == [
+        (2, "B", "Value already reported in submission first.csv"),
+        (4, "A", "Value already reported in submission first.csv"),
+    ]
+    # Running the first submission again does not flag its own IDs
+    assert detect(first, ruleset_path, str(tmp_path / "again.jsonl"), history_path=history_path) == []
+
+    with HistoricalIndex(history_path) as history:
+        assert history.previously_seen("ID", ["A", "D", "Z"], "third.csv") == {"A": "first.csv", "D": "second.csv"}
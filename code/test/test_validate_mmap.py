@@ -0,0 +1,73 @@
+import os
+import pytest
+from gaidp_deep_profi.LLM.validateDataYaml import load_yaml, validate_csv_mmap, validate_data
+
+LLM_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "LLM")
+
+RULES = [
+    {"Technical Field Name": "Zip", "Is Mandatory": "Mandatory", "Regex": r"^\d{5}$",
+     "Anomaly Message": "Invalid data in 'Zip'."},
+    {"Technical Field Name": "Amt", "Is Mandatory": "Optional", "Regex": r"^\d+\.\d{2}$",
+     "Anomaly Message": "Invalid data in 'Amt'."},
+    {"Technical Field Name": "Country", "Is Mandatory": "Optional", "Regex": "^(US|GB|CA)$",
+     "Anomaly Message": "Invalid data in 'Country'."},
+]
+
+
+def report_text(errors_df):
+    """The validation report as save_validation_report writes it to CSV."""
+    return errors_df.to_csv(index=False)
+
+
+def write_csv(tmp_path, text, newline="\n"):
+    path = tmp_path / "data.csv"
+    path.write_bytes(text.replace("\n", newline).encode("utf-8"))
+    return str(path)
+
+
+@pytest.mark.parametrize("text", [
+    # Leading zeros and trailing zeros must be checked as written
+    "Zip,Amt,Country\n01234,1.50,US\n1234,2.5,GB\n",
+    # Missing mandatory values, NA tokens and short lines
+    "Zip,Amt,Country\n,1.00,US\nNA,n/a,\n12345\n99999,3.25,null\n",
+    # Whitespace around values and columns the rules do not name
+    "Other,Zip,Country,Amt\nx, 12345 ,US ,1.00\ny,12345,usa,1\n",
+    # Non-ASCII text
+    "Zip,Country,Amt\n12345,Ü,1.00\n1234Ä,CA,0.10\n",
+])
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+def test_mmap_matches_pandas(tmp_path, text, newline):
+    csv_path = write_csv(tmp_path, text, newline)
+    errors_df = validate_csv_mmap(csv_path, RULES)
+    assert errors_df is not None
+    assert report_text(errors_df) == report_text(validate_data(csv_path, RULES))
+
+
+@pytest.mark.parametrize("text", [
+    '"Zip","Amt"\n1234,1.50\n12345,2.00\n',
+    'Zip,Amt\n"1234",1.50\n12345,2.00\n',
+])
+def test_quoted_csv_falls_back_to_pandas(tmp_path, text):
+    csv_path = write_csv(tmp_path, text)
+    assert validate_csv_mmap(csv_path, RULES) is None
+    errors_df = validate_data(csv_path, RULES)
+    assert list(errors_df["Row"]) == [1]
+    assert list(errors_df["Column"]) == ["Zip"]
+
+
+
+def test_wide_cells_fall_back_to_pandas(tmp_path):
+    csv_path = write_csv(tmp_path, "Zip,Amt,Other\n12345,1.00," + "x" * 5000 + "\n" + "9" * 5000 + ",2.00,y\n")
+    assert validate_csv_mmap(csv_path, RULES) is None
+    assert list(validate_data(csv_path, RULES)["Row"]) == [2]
+
+    # Columns without a rule are never gathered, so their width does not matter
+    csv_path = write_csv(tmp_path, "Zip,Amt,Other\n12345,1.00," + "x" * 5000 + "\n")
+    errors_df = validate_csv_mmap(csv_path, RULES)
+    assert errors_df is not None and errors_df.empty
+def test_sample_data_mmap_matches_pandas():
+    csv_path = os.path.join(LLM_DIR, "corporateloans_sample.csv")
+    validation_rules = load_yaml(os.path.join(LLM_DIR, "validation_rules.yaml"))
+    errors_df = validate_csv_mmap(csv_path, validation_rules)
+    assert errors_df is not None
+    assert report_text(errors_df) == report_text(validate_data(csv_path, validation_rules))
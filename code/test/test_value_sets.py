@@ -0,0 +1,61 @@
+import json
+import pandas as pd
+import yaml
+from gaidp_deep_profi.anomaly_detection import AnomalyDetector
+from gaidp_deep_profi.value_sets import extract_value_set, rule_value_set
+from gaidp_deep_profi.LLM.regExpollama import value_set_regex
+from gaidp_deep_profi.LLM.validateDataYaml import validate_csv_mmap, validate_data, validate_data_chunks
+
+RULES = [
+    {"Technical Field Name": "IndustryCodeType", "Is Mandatory": "Mandatory", "Regex": "^(?:1|2|3|GICS|NAICS|SIC)$",
+     "Anomaly Message": "Invalid data in 'IndustryCodeType'."},
+    {"Technical Field Name": "Country", "Is Mandatory": "Optional", "Regex": "^(?:CA|NA|US)$",
+     "Anomaly Message": "Invalid data in 'Country'."},
+    {"Technical Field Name": "Zip", "Is Mandatory": "Mandatory", "Regex": r"^\d{5}$",
+     "Anomaly Message": "Invalid data in 'Zip'."},
+]
+
+DATA = "IndustryCodeType,Country,Zip\nNAICS,NA,12345\n2,US,NA\n,n/a,12345\n4,,12345\n"
+
+
+def test_numbered_list_accepts_codes_and_labels():
+    rule = extract_value_set("1. NAICS 2. SIC 3. GICS")
+    assert rule == {"Value Set": ["NAICS", "SIC", "GICS"], "Value Set Codes": ["1", "2", "3"]}
+    assert rule_value_set(rule) == {"NAICS", "SIC", "GICS", "1", "2", "3"}
+    assert value_set_regex(rule) == "^(?:1|2|3|GICS|NAICS|SIC)$"
+
+
+def test_value_set_columns_keep_na_words(tmp_path):
+    csv_path = tmp_path / "data.csv"
+    csv_path.write_text(DATA)
+    expected = [(2, "Zip", "Zip is required"),
+                (3, "IndustryCodeType", "IndustryCodeType is required"),
+                (3, "Country", "Invalid data in 'Country'."),
+                (4, "IndustryCodeType", "Invalid data in 'IndustryCodeType'.")]
+
+    reports = [validate_data(str(csv_path), RULES), validate_csv_mmap(str(csv_path), RULES),
+               pd.concat(validate_data_chunks(str(csv_path), RULES, 2), ignore_index=True)]
+    for errors_df in reports:
+        assert list(zip(errors_df["Row"], errors_df["Column"], errors_df["Anomaly Message"])) == expected
+
+
+def test_anomaly_detection_keeps_na_country_codes(tmp_path):
+    ruleset_path = tmp_path / "ruleset.yaml"
+    ruleset_path.write_text(yaml.safe_dump({"rules": [
+        {"Technical Field Name": "Country", "Description": "Country of the obligor",
+         "Allowable Values": "Use the 2 letter Country Code", "Value Set Reference": "ISO 3166-1 alpha-2"},
+        {"Technical Field Name": "IndustryCodeType", "Description": "Industry code scheme",
+         "Allowable Values": "1. NAICS 2. SIC 3. GICS", **extract_value_set("1. NAICS 2. SIC 3. GICS")},
+    ]}))
+    csv_path = tmp_path / "data.csv"
+    csv_path.write_text("Country,IndustryCodeType\nNA,NAICS\nUS,3\nXX,4\n")
+
+    for chunksize in (None, 2):
+        output_path = str(tmp_path / "report.jsonl")
+        detector = AnomalyDetector(str(csv_path), str(ruleset_path), output_path, chunksize=chunksize)
+        detector.load_data()
+        detector.detect_anomalies()
+        detector.generate_report()
+        with open(output_path) as report_file:
+            records = [json.loads(line) for line in report_file]
+        assert [(record["Row"], record["Value"]) for record in records] == [(3, "XX"), (3, "4")]
@@ -0,0 +1,48 @@
+import os
+import pandas as pd
+import pytest
+from gaidp_deep_profi.anomaly_detection import AnomalyDetector
+from gaidp_deep_profi.LLM.validateDataYaml import load_yaml, validate_data, validate_data_chunks
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+LLM_DIR = os.path.join(SRC_DIR, "LLM")
+
+
+def report_text(errors_df):
+    """The validation report as save_validation_report writes it to CSV."""
+    return errors_df.to_csv(index=False)
+
+
+@pytest.fixture(scope="module")
+def validation_rules():
+    return load_yaml(os.path.join(LLM_DIR, "validation_rules.yaml"))
+
+
+def test_validate_data_workers_match_serial(validation_rules):
+    csv_path = os.path.join(LLM_DIR, "corporateloans_sample.csv")
+    serial = validate_data(csv_path, validation_rules)
+    assert not serial.empty
+    assert report_text(validate_data(csv_path, validation_rules, workers=2)) == report_text(serial)
+
+
+def test_validate_data_chunks_workers_match_serial(validation_rules):
+    csv_path = os.path.join(LLM_DIR, "corporateloans_sample.csv")
+    serial = pd.concat(validate_data_chunks(csv_path, validation_rules, 300), ignore_index=True)
+    parallel = pd.concat(validate_data_chunks(csv_path, validation_rules, 300, workers=2), ignore_index=True)
+    assert report_text(parallel) == report_text(serial)
+
+
+@pytest.mark.parametrize("chunksize", [None, 300])
+def test_detect_anomalies_workers_match_serial(tmp_path, chunksize):
+    reports = []
+    for workers in (1, 2):
+        output_path = str(tmp_path / f"anomalies_{workers}.txt")
+        detector = AnomalyDetector(os.path.join(SRC_DIR, "Filtered_Data.csv"),
+                                   os.path.join(SRC_DIR, "processed_ruleset.yaml"), output_path, chunksize=chunksize)
+        detector.load_data()
+        detector.detect_anomalies(workers=workers)
+        detector.generate_report()
+        with open(output_path, "rb") as f:
+            reports.append(f.read())
+    assert b"Issue: Validation failed" in reports[0]
+    assert reports[1] == reports[0]